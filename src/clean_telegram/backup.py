@@ -4,132 +4,483 @@ Exporta mensagens e participantes de grupos para JSON/CSV.
 """
 
 import asyncio
+import contextlib
 import csv
-import json
 import logging
+import os
+import re
+import struct
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-# Tentar importar orjson para performance, com fallback para json stdlib
+import orjson
+
+# msgspec é opcional: só a exportação MessagePack depende dele
 try:
-    import orjson
+    import msgspec
 
-    HAS_ORJSON = True
+    HAS_MSGSPEC = True
 except ImportError:
-    HAS_ORJSON = False
+    HAS_MSGSPEC = False
+
+# zstandard é opcional: só a saída NDJSON comprimida (compress=True) depende dele
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
 
 from telethon import TelegramClient
-from telethon.tl.types import User
+from telethon.tl.types import (
+    DocumentAttributeAnimated,
+    DocumentAttributeAudio,
+    DocumentAttributeFilename,
+    DocumentAttributeSticker,
+    DocumentAttributeVideo,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    User,
+)
 
 logger = logging.getLogger(__name__)
 
+# Buffer de escrita dos arquivos exportados (1 MiB): poucas syscalls grandes
+# em vez de uma por mensagem/participante. open("wb", buffering=N) já monta
+# FileIO + BufferedWriter(N); um buffer maior (4 MiB) não reduz syscalls de
+# forma mensurável e estoura o teto de memória dos exportadores streaming.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Nível zstd das saídas comprimidas: o 3 comprime ~10x o NDJSON (chaves
+# repetidas) muito acima da vazão da API do Telegram
+ZSTD_LEVEL = 3
+
+# Partes de 512 KiB (o teto do Telegram) no upload para o Cloud Chat: o
+# Telethon envia as partes de um arquivo em sequência, então partes maiores
+# significam menos round trips por arquivo
+UPLOAD_PART_SIZE_KB = 512
+
+# Pausa entre páginas do histórico nas exportações. Sem limite, o Telethon
+# assume 1s a cada 100 mensagens (wait_time=None com limit > 3000); um
+# FloodWait curto ainda é dormido pelo próprio cliente (flood_sleep_threshold)
+HISTORY_WAIT_TIME = 0
+
+# Pausa entre páginas do histórico enquanto os participantes paginam ao mesmo
+# tempo (backup_group_*): a mesma do Telethon, para as duas exportações juntas
+# não dobrarem a taxa de requisições da conta
+HISTORY_OVERLAP_WAIT_TIME = 1
+
+# Linhas NDJSON acumuladas antes de cada write() nos exportadores streaming
+_BATCH = 512
+
+# Mídias com tipo/extensão fixos: um lookup por type() em vez de uma cascata
+# de isinstance por mensagem
+_MEDIA_DISPATCH: dict[type, tuple[str, str]] = {
+    MessageMediaPhoto: ("photo", ".jpg"),
+}
+
+# Vídeo, áudio, voz e sticker chegam como MessageMediaDocument e só se
+# distinguem pelos atributos do documento; extensão usada quando o
+# documento não traz nome de arquivo
+_DOCUMENT_DEFAULT_EXT = {
+    "document": ".bin",
+    "video": ".mp4",
+    "audio": ".mp3",
+    "voice": ".ogg",
+    "sticker": ".webp",
+}
+
 
 # =============================================================================
 # Funções auxiliares de serialização (otimizadas)
 # =============================================================================
 
 
-def _json_dumps(obj: Any) -> bytes:
-    """Wrapper que usa orjson se disponível, senão json stdlib.
+# Prefixo de tamanho (uint32 big-endian) de cada frame MessagePack
+_FRAME_LEN = struct.Struct(">I")
 
-    Retorna bytes para compatibilidade com orjson (modo binário).
-    """
-    if HAS_ORJSON:
-        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
-    # Fallback para json stdlib
-    return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+if HAS_MSGSPEC:
+    # Encoder criado uma vez: evita refazer o setup a cada registro
+    _MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+
+
+def _msgpack_frame(obj: Any) -> bytes:
+    """Serializa ``obj`` como um frame MessagePack prefixado pelo tamanho."""
+    payload = _MSGPACK_ENCODER.encode(obj)
+    return _FRAME_LEN.pack(len(payload)) + payload
 
 
 def _serialize_message(message) -> dict[str, Any]:
     """Serializa uma mensagem para JSON.
 
     Função auxiliar para evitar duplicação de código entre
-    exportações streaming e tradicionais.
+    exportações streaming e tradicionais. Datas ficam como ``datetime``:
+    o orjson as emite em RFC 3339 sem ``isoformat()`` no Python.
+
+    O registro é um dict de propósito: o orjson serializa dicts pelo caminho
+    mais rápido, e medido aqui um dataclass com ``slots`` sai ~2x mais lento
+    (além de emitir ``null`` para as chaves opcionais que hoje são omitidas).
     """
+    # sender é property no Telethon: lido uma vez, não a cada campo
+    sender = message.sender
+    media = message.media
     msg_data: dict[str, Any] = {
         "id": message.id,
-        "date": message.date.isoformat() if message.date else None,
+        "date": message.date,
         "text": message.text,
         "sender_id": message.sender_id,
-        "reply_to_msg_id": _safe_getattr(message.reply_to, "reply_to_msg_id")
-        if message.reply_to
-        else None,
-        "has_media": bool(message.media),
+        # getattr(None, ..., None) também devolve None: sem checagem extra
+        "reply_to_msg_id": getattr(message.reply_to, "reply_to_msg_id", None),
+        "has_media": bool(media),
     }
 
     # Adicionar informações do remetente se disponível
-    if message.sender:
+    if sender:
         msg_data["sender"] = {
-            "id": message.sender.id,
-            "username": _safe_getattr(message.sender, "username"),
-            "first_name": _safe_getattr(message.sender, "first_name"),
-            "last_name": _safe_getattr(message.sender, "last_name"),
+            "id": sender.id,
+            "username": getattr(sender, "username", None),
+            "first_name": getattr(sender, "first_name", None),
+            "last_name": getattr(sender, "last_name", None),
         }
 
     # Adicionar informações de mídia
-    if message.media:
-        msg_data["media_type"] = type(message.media).__name__
+    if media:
+        msg_data["media_type"] = type(media).__name__
 
     return msg_data
 
 
-def _serialize_participant(participant, chat_entity) -> dict[str, Any]:
+def _serialize_participant(participant) -> dict[str, Any]:
     """Serializa um participante para JSON.
 
-    Função auxiliar para evitar duplicação de código.
+    Função auxiliar para evitar duplicação de código. Datas ficam como
+    ``datetime`` (serializadas pelo orjson).
     """
-    user = participant.user if hasattr(participant, "user") else participant
+    user = getattr(participant, "user", participant)
 
     user_data: dict[str, Any] = {
         "id": user.id,
-        "first_name": _safe_getattr(user, "first_name"),
-        "last_name": _safe_getattr(user, "last_name"),
-        "username": _safe_getattr(user, "username"),
-        "is_bot": _safe_getattr(user, "bot", False),
-        "is_verified": _safe_getattr(user, "verified", False),
-        "is_premium": _safe_getattr(user, "premium", False),
-        "phone": _safe_getattr(user, "phone"),
+        "first_name": getattr(user, "first_name", None),
+        "last_name": getattr(user, "last_name", None),
+        "username": getattr(user, "username", None),
+        "is_bot": getattr(user, "bot", False),
+        "is_verified": getattr(user, "verified", False),
+        "is_premium": getattr(user, "premium", False),
+        "phone": getattr(user, "phone", None),
     }
 
     # Adicionar informações do participante
     if hasattr(participant, "participant"):
         p = participant.participant
-        user_data["joined_date"] = _safe_getattr(p, "date")
-        if user_data["joined_date"]:
-            user_data["joined_date"] = user_data["joined_date"].isoformat()
-        user_data["inviter_id"] = _safe_getattr(p, "inviter_id")
-        user_data["admin_rank"] = _safe_getattr(p, "admin_rank")
+        user_data["joined_date"] = getattr(p, "date", None)
+        user_data["inviter_id"] = getattr(p, "inviter_id", None)
+        user_data["admin_rank"] = getattr(p, "admin_rank", None)
 
     # Status online (para User)
     if isinstance(user, User):
-        status = _safe_getattr(user, "status")
+        status = getattr(user, "status", None)
         if status:
-            if hasattr(status, "was_online") and status.was_online:
-                user_data["last_online"] = status.was_online.isoformat()
+            was_online = getattr(status, "was_online", None)
+            if was_online:
+                user_data["last_online"] = was_online
             elif hasattr(status, "expires"):
                 user_data["online"] = True
 
     return user_data
 
 
-def _get_timestamp() -> str:
-    """Retorna timestamp atual formatado para nomes de arquivo."""
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
+def _determine_media_type_and_ext(media) -> tuple[str, str]:
+    """Determina tipo de mídia e extensão do arquivo."""
+    fixed = _MEDIA_DISPATCH.get(type(media))
+    if fixed is not None:
+        return fixed
+
+    if isinstance(media, MessageMediaDocument):
+        # Uma passada pelos atributos define o tipo e acha o nome do arquivo.
+        # GIFs também trazem DocumentAttributeVideo, e stickers de vídeo
+        # também: Animated e Sticker têm precedência sobre Video.
+        kind = "document"
+        name = None
+        for attr in getattr(media.document, "attributes", ()):
+            if isinstance(attr, DocumentAttributeAnimated):
+                return "gif", ".mp4"
+            if isinstance(attr, DocumentAttributeSticker):
+                kind = "sticker"
+            elif isinstance(attr, DocumentAttributeAudio):
+                kind = "voice" if attr.voice else "audio"
+            elif isinstance(attr, DocumentAttributeVideo):
+                if kind == "document":
+                    kind = "video"
+            elif name is None and isinstance(attr, DocumentAttributeFilename):
+                name = attr.file_name
+        if name and "." in name:
+            return kind, "." + name.rsplit(".", 1)[-1]
+        return kind, _DOCUMENT_DEFAULT_EXT[kind]
+
+    return "other", ".bin"
+
+
+def _iter_history(
+    client: TelegramClient,
+    chat_entity,
+    paced_until: asyncio.Future[Any] | None = None,
+) -> AsyncIterator[Any]:
+    """Itera todo o histórico do chat sem a pausa padrão entre páginas.
+
+    Enquanto ``paced_until`` não terminar (outra exportação paginando ao
+    mesmo tempo), mantém ``HISTORY_OVERLAP_WAIT_TIME`` entre páginas.
+    """
+    if paced_until is None or paced_until.done():
+        return client.iter_messages(chat_entity, wait_time=HISTORY_WAIT_TIME)
+
+    history = client.iter_messages(chat_entity, wait_time=HISTORY_OVERLAP_WAIT_TIME)
+    # O Telethon relê wait_time antes de cada página
+    paced_until.add_done_callback(
+        lambda _: setattr(history, "wait_time", HISTORY_WAIT_TIME)
+    )
+    return history
+
+
+def _get_timestamp(now: datetime | None = None) -> str:
+    """Retorna timestamp (atual ou ``now``) formatado para nomes de arquivo."""
+    return (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+
+
+# Tudo que não é alfanumérico, espaço, "-" ou "_" (\w = isalnum() ou "_")
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w \-]")
+
+
+def _safe_filename(title: str) -> str:
+    """Reduz o título do chat a um trecho seguro para nome de arquivo (até 50)."""
+    return _UNSAFE_FILENAME_CHARS.sub("", title).strip()[:50]
+
+
+# Os CSVs usam csv.writer (módulo _csv, em C). Um caminho manual com
+# ",".join + checagem de aspas/vírgulas mediu igual ou mais lento, e
+# writerows em lote também; o ganho fica na linha reutilizada abaixo.
+# pandas/pyarrow não compensam: a escrita já é C, e montar colunas em lote
+# custaria duas dependências pesadas e um lote inteiro em memória.
+MESSAGES_CSV_HEADER = [
+    "ID",
+    "Data",
+    "Remetente ID",
+    "Nome",
+    "Username",
+    "Texto",
+    "Tipo Mídia",
+    "Reply To",
+]
+
+PARTICIPANTS_CSV_HEADER = [
+    "ID",
+    "Nome",
+    "Username",
+    "Bot",
+    "Verificado",
+    "Premium",
+    "Telefone",
+    "Data Entrada",
+    "ID Quem Convidou",
+    "Admin Rank",
+]
+
+
+def _fill_message_csv_row(row: list[Any], message, last_date: list[Any]) -> list[Any]:
+    """Preenche ``row`` (reutilizada entre mensagens) com uma linha do CSV.
+
+    ``csv.writer.writerow`` consome a lista na hora, então a mesma lista
+    serve para todas as linhas sem alocar uma nova por mensagem.
+
+    ``last_date`` (``[datetime, isoformat]``, um por exportação) guarda a
+    última data formatada: iter_messages entrega em ordem e mensagens em
+    rajada repetem o mesmo segundo, então comparar com a anterior evita o
+    ``isoformat()``. Datas do Telethon são sempre UTC, então igualdade
+    implica a mesma string.
+    """
+    sender = message.sender
+    if sender:
+        first_name = getattr(sender, "first_name", None) or ""
+        last_name = getattr(sender, "last_name", None) or ""
+        row[3] = f"{first_name} {last_name}".strip() if last_name else first_name
+        row[4] = getattr(sender, "username", None) or ""
+    else:
+        row[3] = row[4] = ""
+
+    media = message.media
+    date = message.date
+    row[0] = message.id
+    if date != last_date[0]:
+        last_date[0] = date
+        last_date[1] = date.isoformat() if date else ""
+    row[1] = last_date[1]
+    row[2] = message.sender_id
+    row[5] = message.text or ""
+    row[6] = type(media).__name__ if media else ""
+    row[7] = getattr(message.reply_to, "reply_to_msg_id", None) or ""
+    return row
+
+
+def _fill_participant_csv_row(row: list[Any], participant) -> list[Any]:
+    """Preenche ``row`` (reutilizada entre participantes) com uma linha do CSV."""
+    user = getattr(participant, "user", participant)
+
+    first_name = getattr(user, "first_name", None) or ""
+    last_name = getattr(user, "last_name", None) or ""
+
+    joined_date = inviter_id = admin_rank = None
+    p = getattr(participant, "participant", None)
+    if p is not None:
+        joined_date = getattr(p, "date", None)
+        inviter_id = getattr(p, "inviter_id", None)
+        admin_rank = getattr(p, "admin_rank", None)
+
+    row[0] = user.id
+    row[1] = f"{first_name} {last_name}".strip() if last_name else first_name
+    # O Telethon preenche ausentes com None (o atributo existe), então o
+    # default do getattr não basta: o "or" é que converte None em ""
+    row[2] = getattr(user, "username", None) or ""
+    # Ternário medido mais rápido que indexar ("Não", "Sim")[bool(...)]
+    row[3] = "Sim" if getattr(user, "bot", False) else "Não"
+    row[4] = "Sim" if getattr(user, "verified", False) else "Não"
+    row[5] = "Sim" if getattr(user, "premium", False) else "Não"
+    row[6] = getattr(user, "phone", None) or ""
+    row[7] = joined_date.isoformat() if joined_date else ""
+    row[8] = "" if inviter_id is None else inviter_id
+    row[9] = admin_rank or ""
+    return row
+
+
+def _fill_participant_csv_row_from_record(
+    row: list[Any], data: dict[str, Any]
+) -> list[Any]:
+    """Como ``_fill_participant_csv_row``, mas a partir do dict já serializado.
+
+    Usado quando JSON e CSV saem do mesmo participante: os atributos do
+    Telethon são lidos uma única vez, em ``_serialize_participant``.
+    """
+    first_name = data["first_name"] or ""
+    last_name = data["last_name"] or ""
+    joined_date = data.get("joined_date")
+    inviter_id = data.get("inviter_id")
+
+    row[0] = data["id"]
+    row[1] = f"{first_name} {last_name}".strip() if last_name else first_name
+    row[2] = data["username"] or ""
+    row[3] = "Sim" if data["is_bot"] else "Não"
+    row[4] = "Sim" if data["is_verified"] else "Não"
+    row[5] = "Sim" if data["is_premium"] else "Não"
+    row[6] = data["phone"] or ""
+    row[7] = joined_date.isoformat() if joined_date else ""
+    row[8] = "" if inviter_id is None else inviter_id
+    row[9] = data.get("admin_rank") or ""
+    return row
+
+
+_STREAM_END = object()
+
+
+@contextlib.asynccontextmanager
+async def _read_ahead(
+    items: AsyncIterator[Any], maxsize: int = 2 * _BATCH
+) -> AsyncIterator[AsyncIterator[Any]]:
+    """Consome ``items`` numa task à parte, até ``maxsize`` itens à frente.
+
+    A paginação do Telethon fica em voo enquanto o corpo do ``async with``
+    serializa e grava o que já chegou, em vez de esperar cada página só
+    depois de processar a anterior. Erros da iteração reaparecem ao fim do
+    iterador entregue; se o corpo falhar, a task produtora é cancelada.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def _produce() -> None:
+        try:
+            async for item in items:
+                await queue.put(item)
+        except Exception:
+            # Deixa o consumidor processar o que já chegou antes de propagar
+            await queue.put(_STREAM_END)
+            raise
+        await queue.put(_STREAM_END)
+
+    producer = asyncio.create_task(_produce())
 
+    async def _drain() -> AsyncIterator[Any]:
+        while (item := await queue.get()) is not _STREAM_END:
+            yield item
+        await producer
 
-def _safe_getattr(obj: Any, attr: str, default: Any = None) -> Any:
-    """getattr seguro que retorna default se AttributeError ocorrer."""
     try:
-        return getattr(obj, attr, default)
-    except (AttributeError, TypeError):
-        return default
+        yield _drain()
+    finally:
+        # Corpo falhou: o produtor não tem mais quem consuma a fila
+        if not producer.done():
+            producer.cancel()
+
+
+async def _write_json_document(
+    output_path: str,
+    header: dict[str, Any],
+    items_key: str,
+    total_key: str,
+    items: AsyncIterator[dict[str, Any]],
+) -> int:
+    """Grava um documento JSON indentado com um array, item a item.
+
+    Produz ``{**header, items_key: [...], total_key: N}`` sem montar a lista
+    em memória: cada item é serializado e escrito assim que chega. Se a
+    iteração falhar, o arquivo parcial é removido.
+
+    Returns:
+        Número de itens escritos.
+    """
+    count = 0
+    try:
+        with open(output_path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            # Cabeçalho indentado sem o "\n}" final, seguido da abertura do array
+            f.write(orjson.dumps(header, option=orjson.OPT_INDENT_2)[:-2])
+            f.write(b',\n  "' + items_key.encode() + b'": [')
+
+            # Itens acumulados e gravados em lotes de _BATCH com um único
+            # join: um write() por lote em vez de dois por item
+            dumps = orjson.dumps
+            opt = orjson.OPT_INDENT_2
+            sep = b",\n    "
+            batch: list[bytes] = []
+            append = batch.append
+
+            async with _read_ahead(items) as stream:
+                async for item in stream:
+                    # Quebras de linha só aparecem entre tokens (strings são
+                    # escapadas), então reindentar é um replace seguro
+                    append(dumps(item, option=opt).replace(b"\n", b"\n    "))
+                    if len(batch) >= _BATCH:
+                        f.write(sep if count else b"\n    ")
+                        f.write(sep.join(batch))
+                        count += len(batch)
+                        batch.clear()
+
+            if batch:
+                f.write(sep if count else b"\n    ")
+                f.write(sep.join(batch))
+                count += len(batch)
+
+            f.write(b"\n  ]" if count else b"]")
+            f.write(b',\n  "' + total_key.encode() + b'": %d\n}' % count)
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
+
+    return count
 
 
 async def export_messages_to_json(
     client: TelegramClient,
     chat_entity,
     output_path: str,
+    *,
+    paced_until: asyncio.Future[Any] | None = None,
 ) -> int:
     """Exporta todas as mensagens de um chat para JSON.
 
@@ -137,134 +488,219 @@ async def export_messages_to_json(
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
         output_path: Caminho do arquivo JSON de saída.
+        paced_until: Exportação que pagina ao mesmo tempo; até ela terminar,
+            o histórico mantém ``HISTORY_OVERLAP_WAIT_TIME`` entre páginas.
 
     Returns:
         Número de mensagens exportadas.
     """
-    messages_data = []
-
-    async for message in client.iter_messages(chat_entity):
-        messages_data.append(_serialize_message(message))
-
-    # Salvar JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "export_date": datetime.now().isoformat(),
-                "chat_id": chat_entity.id,
-                "chat_title": _safe_getattr(chat_entity, "title"),
-                "total_messages": len(messages_data),
-                "messages": messages_data,
-            },
-            f,
-            ensure_ascii=False,
-            indent=2,
+    return await _write_json_document(
+        output_path,
+        {
+            "export_date": datetime.now(),
+            "chat_id": chat_entity.id,
+            "chat_title": getattr(chat_entity, "title", None),
+        },
+        "messages",
+        "total_messages",
+        (
+            _serialize_message(m)
+            async for m in _iter_history(client, chat_entity, paced_until)
+        ),
+    )
+
+
+async def _write_record_stream(
+    output_path: str,
+    header: dict[str, Any],
+    items: AsyncIterator[dict[str, Any]],
+    encode: Callable[[Any], bytes] | None = None,
+    compress: bool = False,
+) -> int:
+    """Grava ``header`` e cada item de ``items`` como registros ``encode``.
+
+    Sem ``encode``, cada registro é uma linha NDJSON (orjson chamado direto
+    por item). Com ``compress``, a saída
+    passa por um compressor zstd em streaming (um único frame).
+
+    ``items`` é lido à frente por ``_read_ahead``: o pedido da próxima página
+    fica em voo durante o encode. Cada lote de ``_BATCH`` linhas é gravado
+    em uma thread, sem bloquear o event loop no disco. Se a iteração falhar,
+    o arquivo parcial é removido.
+
+    Returns:
+        Número de itens gravados (sem contar o cabeçalho).
+    """
+    if compress and not HAS_ZSTD:
+        raise RuntimeError(
+            "Saída comprimida requer zstandard: pip install clean-telegram[zstd]"
         )
 
-    return len(messages_data)
+    count = 0
+    try:
+        with contextlib.ExitStack() as stack:
+            # Encoders geram bytes: arquivo em modo binário
+            f = stack.enter_context(
+                open(output_path, "wb", buffering=WRITE_BUFFER_SIZE)
+            )
+            if compress:
+                # threads=-1: compressão nas demais CPUs, fora do event loop
+                cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+                f = stack.enter_context(cctx.stream_writer(f))
+
+            dumps = orjson.dumps
+            opt = orjson.OPT_APPEND_NEWLINE
+            f.write(dumps(header, option=opt) if encode is None else encode(header))
+
+            batch: list[bytes] = []
+            append = batch.append
+            async with _read_ahead(items) as stream:
+                async for item in stream:
+                    append(
+                        dumps(item, option=opt) if encode is None else encode(item)
+                    )
+                    if len(batch) >= _BATCH:
+                        await asyncio.to_thread(f.write, b"".join(batch))
+                        count += len(batch)
+                        batch.clear()
+
+            f.write(b"".join(batch))
+            count += len(batch)
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
+
+    return count
 
 
 async def export_messages_to_json_streaming(
     client: TelegramClient,
     chat_entity,
     output_path: str,
+    *,
+    compress: bool = False,
+    paced_until: asyncio.Future[Any] | None = None,
 ) -> int:
     """Exporta mensagens em formato NDJSON (streaming, O(1) memória).
 
     Cada linha é um objeto JSON válido. Primeira linha contém metadados.
-    Usa orjson se disponível para performance 2-3x maior.
 
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
-        output_path: Caminho do arquivo NDJSON de saída.
+        output_path: Caminho do arquivo NDJSON de saída (``.ndjson.zst`` se
+            ``compress``).
+        compress: Comprime a saída com zstd (requer ``zstandard``).
+        paced_until: Exportação que pagina ao mesmo tempo; até ela terminar,
+            o histórico mantém ``HISTORY_OVERLAP_WAIT_TIME`` entre páginas.
 
     Returns:
         Número de mensagens exportadas.
-    """
-    count = 0
 
-    # orjson requer modo binário
-    with open(output_path, "wb") as f:
-        # Escrever cabeçalho de metadados
-        header = {
+    Raises:
+        RuntimeError: Se ``compress`` e ``zstandard`` não estiver instalado.
+    """
+    return await _write_record_stream(
+        output_path,
+        {
             "_format": "ndjson",
-            "export_date": datetime.now().isoformat(),
+            "export_date": datetime.now(),
             "chat_id": chat_entity.id,
-            "chat_title": _safe_getattr(chat_entity, "title"),
-        }
-        f.write(_json_dumps(header))
+            "chat_title": getattr(chat_entity, "title", None),
+        },
+        (
+            _serialize_message(m)
+            async for m in _iter_history(client, chat_entity, paced_until)
+        ),
+        compress=compress,
+    )
 
-        # Streaming de mensagens (uma por vez em memória)
-        async for message in client.iter_messages(chat_entity):
-            msg_data = _serialize_message(message)
-            f.write(_json_dumps(msg_data))
-            count += 1
 
-    return count
+async def export_messages_to_msgpack_streaming(
+    client: TelegramClient,
+    chat_entity,
+    output_path: str,
+) -> int:
+    """Exporta mensagens como frames MessagePack (streaming, O(1) memória).
+
+    Alternativa compacta ao NDJSON para ingestão por outras ferramentas.
+    Cada registro é ``uint32 big-endian (tamanho) + payload``; o primeiro
+    frame contém os metadados. Requer ``msgspec``.
+
+    Args:
+        client: Cliente Telethon conectado.
+        chat_entity: Entidade do chat (grupo/canal).
+        output_path: Caminho do arquivo de saída.
+
+    Returns:
+        Número de mensagens exportadas.
+
+    Raises:
+        RuntimeError: Se ``msgspec`` não estiver instalado.
+    """
+    if not HAS_MSGSPEC:
+        raise RuntimeError(
+            "Exportação MessagePack requer msgspec: pip install clean-telegram[msgpack]"
+        )
+
+    return await _write_record_stream(
+        output_path,
+        {
+            "_format": "msgpack",
+            "export_date": datetime.now(),
+            "chat_id": chat_entity.id,
+            "chat_title": getattr(chat_entity, "title", None),
+        },
+        (_serialize_message(m) async for m in _iter_history(client, chat_entity)),
+        encode=_msgpack_frame,
+    )
 
 
 async def export_messages_to_csv(
     client: TelegramClient,
     chat_entity,
     output_path: str,
+    *,
+    paced_until: asyncio.Future[Any] | None = None,
 ) -> int:
     """Exporta todas as mensagens de um chat para CSV.
 
+    Se a iteração falhar, o arquivo parcial é removido.
+
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
         output_path: Caminho do arquivo CSV de saída.
+        paced_until: Exportação que pagina ao mesmo tempo; até ela terminar,
+            o histórico mantém ``HISTORY_OVERLAP_WAIT_TIME`` entre páginas.
 
     Returns:
         Número de mensagens exportadas.
     """
     count = 0
 
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(
-            [
-                "ID",
-                "Data",
-                "Remetente ID",
-                "Nome",
-                "Username",
-                "Texto",
-                "Tipo Mídia",
-                "Reply To",
-            ]
-        )
-
-        async for message in client.iter_messages(chat_entity):
-            sender_name = ""
-            sender_username = ""
-            if message.sender:
-                first_name = _safe_getattr(message.sender, "first_name", "")
-                last_name = _safe_getattr(message.sender, "last_name", "")
-                sender_name = f"{first_name} {last_name}".strip()
-                sender_username = _safe_getattr(message.sender, "username", "")
-
-            media_type = type(message.media).__name__ if message.media else ""
-            reply_to = (
-                _safe_getattr(message.reply_to, "reply_to_msg_id")
-                if message.reply_to
-                else ""
-            )
-
-            writer.writerow(
-                [
-                    message.id,
-                    message.date.isoformat() if message.date else "",
-                    message.sender_id,
-                    sender_name,
-                    sender_username,
-                    message.text or "",
-                    media_type,
-                    reply_to,
-                ]
-            )
-            count += 1
+    try:
+        with open(
+            output_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as f:
+            writer = csv.writer(f)
+            writer.writerow(MESSAGES_CSV_HEADER)
+
+            write_row = writer.writerow
+            row: list[Any] = [""] * len(MESSAGES_CSV_HEADER)
+            last_date: list[Any] = [None, ""]
+            history = _iter_history(client, chat_entity, paced_until)
+            async with _read_ahead(history) as messages:
+                async for message in messages:
+                    write_row(_fill_message_csv_row(row, message, last_date))
+                    count += 1
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
 
     return count
 
@@ -284,67 +720,60 @@ async def export_participants_to_json(
     Returns:
         Número de participantes exportados.
     """
-    participants_data = []
-
-    async for participant in client.iter_participants(chat_entity):
-        participants_data.append(_serialize_participant(participant, chat_entity))
-
-    # Salvar JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "export_date": datetime.now().isoformat(),
-                "chat_id": chat_entity.id,
-                "chat_title": _safe_getattr(chat_entity, "title"),
-                "total_participants": len(participants_data),
-                "participants": participants_data,
-            },
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
-
-    return len(participants_data)
+    return await _write_json_document(
+        output_path,
+        {
+            "export_date": datetime.now(),
+            "chat_id": chat_entity.id,
+            "chat_title": getattr(chat_entity, "title", None),
+        },
+        "participants",
+        "total_participants",
+        (
+            _serialize_participant(p)
+            async for p in client.iter_participants(chat_entity)
+        ),
+    )
 
 
 async def export_participants_to_json_streaming(
     client: TelegramClient,
     chat_entity,
     output_path: str,
+    *,
+    compress: bool = False,
 ) -> int:
     """Exporta participantes em formato NDJSON (streaming, O(1) memória).
 
     Cada linha é um objeto JSON válido. Primeira linha contém metadados.
-    Usa orjson se disponível para performance 2-3x maior.
 
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
-        output_path: Caminho do arquivo NDJSON de saída.
+        output_path: Caminho do arquivo NDJSON de saída (``.ndjson.zst`` se
+            ``compress``).
+        compress: Comprime a saída com zstd (requer ``zstandard``).
 
     Returns:
         Número de participantes exportados.
-    """
-    count = 0
 
-    # orjson requer modo binário
-    with open(output_path, "wb") as f:
-        # Escrever cabeçalho de metadados
-        header = {
+    Raises:
+        RuntimeError: Se ``compress`` e ``zstandard`` não estiver instalado.
+    """
+    return await _write_record_stream(
+        output_path,
+        {
             "_format": "ndjson",
-            "export_date": datetime.now().isoformat(),
+            "export_date": datetime.now(),
             "chat_id": chat_entity.id,
-            "chat_title": _safe_getattr(chat_entity, "title"),
-        }
-        f.write(_json_dumps(header))
-
-        # Streaming de participantes (um por vez em memória)
-        async for participant in client.iter_participants(chat_entity):
-            user_data = _serialize_participant(participant, chat_entity)
-            f.write(_json_dumps(user_data))
-            count += 1
-
-    return count
+            "chat_title": getattr(chat_entity, "title", None),
+        },
+        (
+            _serialize_participant(p)
+            async for p in client.iter_participants(chat_entity)
+        ),
+        compress=compress,
+    )
 
 
 async def export_participants_to_csv(
@@ -354,6 +783,8 @@ async def export_participants_to_csv(
 ) -> int:
     """Exporta todos os participantes de um grupo para CSV.
 
+    Se a iteração falhar, o arquivo parcial é removido.
+
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
@@ -364,59 +795,67 @@ async def export_participants_to_csv(
     """
     count = 0
 
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(
-            [
-                "ID",
-                "Nome",
-                "Username",
-                "Bot",
-                "Verificado",
-                "Premium",
-                "Telefone",
-                "Data Entrada",
-                "ID Quem Convidou",
-                "Admin Rank",
-            ]
-        )
-
-        async for participant in client.iter_participants(chat_entity):
-            user = participant.user if hasattr(participant, "user") else participant
-
-            first_name = _safe_getattr(user, "first_name", "")
-            last_name = _safe_getattr(user, "last_name", "")
-            full_name = f"{first_name} {last_name}".strip()
-
-            joined_date = None
-            inviter_id = None
-            admin_rank = None
-
-            if hasattr(participant, "participant"):
-                p = participant.participant
-                joined_date = _safe_getattr(p, "date")
-                inviter_id = _safe_getattr(p, "inviter_id")
-                admin_rank = _safe_getattr(p, "admin_rank")
-
-            writer.writerow(
-                [
-                    user.id,
-                    full_name,
-                    _safe_getattr(user, "username", "") or "",
-                    "Sim" if _safe_getattr(user, "bot", False) else "Não",
-                    "Sim" if _safe_getattr(user, "verified", False) else "Não",
-                    "Sim" if _safe_getattr(user, "premium", False) else "Não",
-                    _safe_getattr(user, "phone", "") or "",
-                    joined_date.isoformat() if joined_date else "",
-                    inviter_id or "",
-                    admin_rank or "",
-                ]
-            )
-            count += 1
+    try:
+        with open(
+            output_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as f:
+            writer = csv.writer(f)
+            writer.writerow(PARTICIPANTS_CSV_HEADER)
+
+            write_row = writer.writerow
+            row: list[Any] = [""] * len(PARTICIPANTS_CSV_HEADER)
+            members = client.iter_participants(chat_entity)
+            async with _read_ahead(members) as participants:
+                async for participant in participants:
+                    write_row(_fill_participant_csv_row(row, participant))
+                    count += 1
+    except BaseException:
+        Path(output_path).unlink(missing_ok=True)
+        raise
 
     return count
 
 
+async def _export_overlapped(
+    export_messages: Callable[[asyncio.Future[Any]], Awaitable[None]],
+    export_participants: Callable[[], Awaitable[None]],
+    messages_files: tuple[str, ...],
+    participants_files: tuple[str, ...],
+) -> None:
+    """Exporta mensagens e participantes ao mesmo tempo.
+
+    São paginações independentes: juntas, a latência de rede de uma sobrepõe
+    a da outra. ``export_messages`` recebe a tarefa dos participantes para
+    manter a pausa entre páginas do histórico enquanto ela pagina. Se uma
+    exportação falhar, a outra é cancelada e os arquivos das que não
+    terminaram são removidos antes de propagar a falha.
+    """
+    participants = asyncio.ensure_future(export_participants())
+    messages = asyncio.ensure_future(export_messages(participants))
+    files = {messages: messages_files, participants: participants_files}
+    try:
+        await asyncio.wait(files, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in files:
+            task.cancel()
+        outcomes = await asyncio.gather(*files, return_exceptions=True)
+        for paths, outcome in zip(files.values(), outcomes):
+            if isinstance(outcome, BaseException):
+                for path in paths:
+                    Path(path).unlink(missing_ok=True)
+
+    # A falha original, não o cancelamento que ela provocou na outra
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException) and not isinstance(
+            outcome, asyncio.CancelledError
+        ):
+            raise outcome
+
+
 async def backup_group_full(
     client: TelegramClient,
     chat_entity,
@@ -436,48 +875,84 @@ async def backup_group_full(
     """
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    timestamp = _get_timestamp()
-    chat_title = _safe_getattr(chat_entity, "title", str(chat_entity.id))
-    safe_name = "".join(
-        c for c in chat_title if c.isalnum() or c in (" ", "-", "_")
-    ).strip()
-    safe_name = safe_name[:50]  # Limitar tamanho do nome
+    # Um único instante para nomes de arquivo, backup_date e resumo
+    now = datetime.now()
+    timestamp = _get_timestamp(now)
+    chat_title = getattr(chat_entity, "title", str(chat_entity.id))
+    safe_name = _safe_filename(chat_title)
+
+    # Caminhos montados uma vez; cada formato usa os que lhe cabem
+    base = f"{output_dir}/{safe_name}"
+    messages_json = f"{base}_messages_{timestamp}.json"
+    messages_csv = f"{base}_messages_{timestamp}.csv"
+    participants_json = f"{base}_participants_{timestamp}.json"
+    participants_csv = f"{base}_participants_{timestamp}.csv"
 
     results: dict[str, Any] = {
         "chat_id": chat_entity.id,
         "chat_title": chat_title,
-        "backup_date": datetime.now().isoformat(),
+        "backup_date": now.isoformat(),
     }
 
-    # Exportar mensagens
-    if formats in ("json", "both"):
-        messages_json = f"{output_dir}/{safe_name}_messages_{timestamp}.json"
-        msg_count = await export_messages_to_json(client, chat_entity, messages_json)
-        results["messages_json"] = messages_json
-        results["messages_count"] = msg_count
-
-    if formats in ("csv", "both"):
-        messages_csv = f"{output_dir}/{safe_name}_messages_{timestamp}.csv"
-        msg_count = await export_messages_to_csv(client, chat_entity, messages_csv)
-        results["messages_csv"] = messages_csv
-        results["messages_count"] = msg_count
-
-    # Exportar participantes
-    if formats in ("json", "both"):
-        participants_json = f"{output_dir}/{safe_name}_participants_{timestamp}.json"
-        part_count = await export_participants_to_json(
-            client, chat_entity, participants_json
-        )
-        results["participants_json"] = participants_json
-        results["participants_count"] = part_count
+    async def _export_messages(participants: asyncio.Future[Any]) -> None:
+        # "both" itera as mensagens uma única vez; o JSON continua sendo o
+        # documento indentado de formats="json"
+        if formats == "both":
+            msg_result = await export_messages_both_formats(
+                client,
+                chat_entity,
+                messages_json,
+                messages_csv,
+                ndjson=False,
+                paced_until=participants,
+            )
+            results["messages_json"] = messages_json
+            results["messages_csv"] = messages_csv
+            results["messages_count"] = msg_result["messages_count"]
+        elif formats == "json":
+            msg_count = await export_messages_to_json(
+                client, chat_entity, messages_json, paced_until=participants
+            )
+            results["messages_json"] = messages_json
+            results["messages_count"] = msg_count
+        elif formats == "csv":
+            msg_count = await export_messages_to_csv(
+                client, chat_entity, messages_csv, paced_until=participants
+            )
+            results["messages_csv"] = messages_csv
+            results["messages_count"] = msg_count
 
-    if formats in ("csv", "both"):
-        participants_csv = f"{output_dir}/{safe_name}_participants_{timestamp}.csv"
-        part_count = await export_participants_to_csv(
-            client, chat_entity, participants_csv
-        )
-        results["participants_csv"] = participants_csv
-        results["participants_count"] = part_count
+    async def _export_participants() -> None:
+        if formats == "both":
+            part_result = await export_participants_both_formats(
+                client,
+                chat_entity,
+                participants_json,
+                participants_csv,
+                ndjson=False,
+            )
+            results["participants_json"] = participants_json
+            results["participants_csv"] = participants_csv
+            results["participants_count"] = part_result["participants_count"]
+        elif formats == "json":
+            part_count = await export_participants_to_json(
+                client, chat_entity, participants_json
+            )
+            results["participants_json"] = participants_json
+            results["participants_count"] = part_count
+        elif formats == "csv":
+            part_count = await export_participants_to_csv(
+                client, chat_entity, participants_csv
+            )
+            results["participants_csv"] = participants_csv
+            results["participants_count"] = part_count
+
+    await _export_overlapped(
+        _export_messages,
+        _export_participants,
+        (messages_json, messages_csv),
+        (participants_json, participants_csv),
+    )
 
     return results
 
@@ -503,21 +978,15 @@ async def download_media_from_chat(
     Returns:
         Dicionário com contagem de arquivos baixados por tipo.
     """
-    from telethon.tl.types import (
-        MessageMediaAudio,
-        MessageMediaDocument,
-        MessageMediaGeoLive,
-        MessageMediaPhoto,
-        MessageMediaSticker,
-        MessageMediaVideo,
-        MessageMediaVoice,
-    )
-
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
     media_dir = Path(output_dir) / "media"
     media_dir.mkdir(exist_ok=True)
 
+    # Um timestamp por execução: agrupa os arquivos do backup e a
+    # unicidade vem de sender_id + message.id
+    timestamp = _get_timestamp()
+
     counts: dict[str, int] = {
         "photo": 0,
         "video": 0,
@@ -533,82 +1002,45 @@ async def download_media_from_chat(
     async def _progress_callback(received: int, total: int) -> None:
         """Callback de progresso do download."""
         if received == 0:  # Primeira chamada
-            print(f"  Baixando: {total / 1024 / 1024:.1f} MB...")
-
-    async for message in client.iter_messages(chat_entity, limit=limit):
-        if not message.media:
-            continue
-
-        media_type = "other"
-        ext = ".bin"  # Valor padrão
-        should_download = media_types is None  # Baixar tudo se não especificado
-
-        if isinstance(message.media, MessageMediaPhoto):
-            media_type = "photo"
-            ext = ".jpg"
-        elif isinstance(message.media, (MessageMediaVideo, MessageMediaGeoLive)):
-            media_type = "video"
-            ext = ".mp4"
-        elif isinstance(message.media, MessageMediaDocument):
-            doc = message.media.document
-            media_type = "document"
-            # Tentar determinar extensão pelo nome do arquivo
-            if hasattr(doc, "attributes"):
-                for attr in doc.attributes:
-                    if hasattr(attr, "file_name"):
-                        name = attr.file_name
-                        if "." in name:
-                            ext = "." + name.rsplit(".", 1)[-1]
-                        else:
-                            ext = ""
-                        break
-            if ext == "":
-                ext = ".bin"  # Fallback
-        elif isinstance(message.media, MessageMediaAudio):
-            media_type = "audio"
-            ext = ".mp3"
-        elif isinstance(message.media, MessageMediaVoice):
-            media_type = "voice"
-            ext = ".ogg"
-        elif isinstance(message.media, MessageMediaSticker):
-            media_type = "sticker"
-            ext = ".webp"
-        else:
-            # Verificar se é GIF
-            if hasattr(message.media, "document"):
-                if hasattr(message.media.document, "mime_type"):
-                    if message.media.document.mime_type == "video/mp4":
-                        media_type = "gif"
-                        ext = ".mp4"
-
-        # Filtrar por tipo se especificado
-        if media_types is not None:
-            should_download = media_type in media_types
-
-        if should_download:
-            counts[media_type] += 1
-            counts["total"] += 1
-
-            # Gerar nome do arquivo
-            timestamp = _get_timestamp()
-            sender_id = message.sender_id or "unknown"
-            filename = f"{timestamp}_{sender_id}_{message.id}{ext}"
-
-            # Criar subdiretório para o tipo de mídia
-            type_dir = media_dir / media_type
-            type_dir.mkdir(exist_ok=True)
-
-            file_path = type_dir / filename
-
-            try:
-                path = await client.download_media(
-                    message,
-                    file=str(file_path),
-                    progress_callback=_progress_callback,
-                )
-                logger.debug(f"Mídia baixada: {path}")
-            except Exception as e:
-                logger.warning(f"Erro ao baixar mídia da mensagem {message.id}: {e}")
+            logger.info("  Baixando: %.1f MB...", total / 1024 / 1024)
+
+    # A próxima página de mensagens chega enquanto a mídia atual é baixada
+    pages = client.iter_messages(chat_entity, limit=limit)
+    async with _read_ahead(pages) as messages:
+        async for message in messages:
+            if not message.media:
+                continue
+
+            media_type, ext = _determine_media_type_and_ext(message.media)
+
+            # Filtrar por tipo se especificado
+            should_download = media_types is None or media_type in media_types
+
+            if should_download:
+                counts[media_type] += 1
+                counts["total"] += 1
+
+                # Gerar nome do arquivo
+                sender_id = message.sender_id or "unknown"
+                filename = f"{timestamp}_{sender_id}_{message.id}{ext}"
+
+                # Criar subdiretório para o tipo de mídia
+                type_dir = media_dir / media_type
+                type_dir.mkdir(exist_ok=True)
+
+                file_path = type_dir / filename
+
+                try:
+                    path = await client.download_media(
+                        message,
+                        file=str(file_path),
+                        progress_callback=_progress_callback,
+                    )
+                    logger.debug("Mídia baixada: %s", path)
+                except Exception as e:
+                    logger.warning(
+                        "Erro ao baixar mídia da mensagem %s: %s", message.id, e
+                    )
 
     return counts
 
@@ -623,7 +1055,8 @@ async def download_media_parallel(
 ) -> dict[str, int]:
     """Baixa mídia com paralelismo controlado (70%+ mais rápido).
 
-    Usa asyncio.Semaphore para limitar downloads simultâneos.
+    Um produtor pagina as mensagens e enfileira as mídias em uma fila
+    limitada; ``max_concurrent`` workers consomem a fila e baixam.
     Ideal para conexões rápidas onde o download sequencial subutiliza bandwidth.
 
     Args:
@@ -637,47 +1070,15 @@ async def download_media_parallel(
     Returns:
         Dicionário com contagem de arquivos baixados por tipo.
     """
-    # Importar tipos de mídia, com fallback para compatibilidade
-    from telethon.tl.types import (
-        MessageMediaDocument,
-        MessageMediaGeoLive,
-        MessageMediaPhoto,
-    )
-
-    # Tipos que podem não existir em todas as versões
-    try:
-        from telethon.tl.types import MessageMediaVideo
-
-        HAS_VIDEO = True
-    except ImportError:
-        HAS_VIDEO = False
-
-    try:
-        from telethon.tl.types import MessageMediaAudio
-
-        HAS_AUDIO = True
-    except ImportError:
-        HAS_AUDIO = False
-
-    try:
-        from telethon.tl.types import MessageMediaVoice
-
-        HAS_VOICE = True
-    except ImportError:
-        HAS_VOICE = False
-
-    try:
-        from telethon.tl.types import MessageMediaSticker
-
-        HAS_STICKER = True
-    except ImportError:
-        HAS_STICKER = False
-
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
     media_dir = Path(output_dir) / "media"
     media_dir.mkdir(exist_ok=True)
 
+    # Um timestamp por execução: agrupa os arquivos do backup e a
+    # unicidade vem de sender_id + message.id
+    timestamp = _get_timestamp()
+
     counts: dict[str, int] = {
         "photo": 0,
         "video": 0,
@@ -690,115 +1091,71 @@ async def download_media_parallel(
         "total": 0,
     }
 
-    semaphore = asyncio.Semaphore(max_concurrent)
-
     async def _progress_callback(received: int, total: int) -> None:
         """Callback de progresso do download."""
         if received == 0:  # Primeira chamada
-            print(f"  Baixando: {total / 1024 / 1024:.1f} MB...")
-
-    def _determine_media_type_and_ext(message) -> tuple[str, str]:
-        """Determina tipo de mídia e extensão do arquivo."""
-        media_type = "other"
-        ext = ""
-
-        if isinstance(message.media, MessageMediaPhoto):
-            media_type = "photo"
-            ext = ".jpg"
-        elif HAS_VIDEO and isinstance(message.media, MessageMediaVideo):
-            media_type = "video"
-            ext = ".mp4"
-        elif isinstance(message.media, MessageMediaGeoLive):
-            media_type = "video"
-            ext = ".mp4"
-        elif isinstance(message.media, MessageMediaDocument):
-            doc = message.media.document
-            media_type = "document"
-            if hasattr(doc, "attributes"):
-                for attr in doc.attributes:
-                    if hasattr(attr, "file_name"):
-                        name = attr.file_name
-                        if "." in name:
-                            ext = "." + name.rsplit(".", 1)[-1]
-                        else:
-                            ext = ""
-                        break
-            if ext == "":
-                ext = ".bin"
-        elif HAS_AUDIO and isinstance(message.media, MessageMediaAudio):
-            media_type = "audio"
-            ext = ".mp3"
-        elif HAS_VOICE and isinstance(message.media, MessageMediaVoice):
-            media_type = "voice"
-            ext = ".ogg"
-        elif HAS_STICKER and isinstance(message.media, MessageMediaSticker):
-            media_type = "sticker"
-            ext = ".webp"
-        else:
-            # Verificar se é GIF
-            if hasattr(message.media, "document"):
-                if hasattr(message.media.document, "mime_type"):
-                    if message.media.document.mime_type == "video/mp4":
-                        media_type = "gif"
-                        ext = ".mp4"
-
-        return media_type, ext
-
-    async def _download_one(message) -> str | None:
-        """Baixa uma mídia com proteção de semaphore."""
-        async with semaphore:
-            media_type, ext = _determine_media_type_and_ext(message)
-
-            # Filtrar por tipo se especificado
-            if media_types is not None and media_type not in media_types:
-                return None
+            logger.info("  Baixando: %.1f MB...", total / 1024 / 1024)
 
-            # Gerar nome do arquivo
-            timestamp = _get_timestamp()
-            sender_id = message.sender_id or "unknown"
-            filename = f"{timestamp}_{sender_id}_{message.id}{ext}"
+    async def _download_one(message, media_type: str, ext: str) -> bool:
+        """Baixa uma mídia; retorna True em caso de sucesso."""
+        # Gerar nome do arquivo
+        sender_id = message.sender_id or "unknown"
+        filename = f"{timestamp}_{sender_id}_{message.id}{ext}"
 
-            # Criar subdiretório para o tipo de mídia
-            type_dir = media_dir / media_type
-            type_dir.mkdir(exist_ok=True)
+        # Criar subdiretório para o tipo de mídia
+        type_dir = media_dir / media_type
+        type_dir.mkdir(exist_ok=True)
 
-            file_path = type_dir / filename
+        file_path = type_dir / filename
 
-            try:
-                path = await client.download_media(
-                    message,
-                    file=str(file_path),
-                    progress_callback=_progress_callback,
-                )
-                logger.debug(f"Mídia baixada: {path}")
-                return media_type
-            except Exception as e:
-                logger.warning(f"Erro ao baixar mídia da mensagem {message.id}: {e}")
-                return None
-
-    # Primeiro: coletar todas as mensagens com mídia
-    download_tasks = []
-    async for message in client.iter_messages(chat_entity, limit=limit):
-        if not message.media:
-            continue
-
-        media_type, _ = _determine_media_type_and_ext(message)
-
-        # Pré-filtrar para evitar criar tasks desnecessárias
-        if media_types is None or media_type in media_types:
-            download_tasks.append(_download_one(message))
-
-    # Executar downloads em paralelo (com limite do semaphore)
-    results = await asyncio.gather(*download_tasks, return_exceptions=True)
-
-    # Contabilizar resultados
-    for result in results:
-        if isinstance(result, Exception):
-            # Exceção já foi logada em _download_one
-            continue
-        if result is not None:
-            counts[result] += 1
-            counts["total"] += 1
+        try:
+            path = await client.download_media(
+                message,
+                file=str(file_path),
+                progress_callback=_progress_callback,
+            )
+            logger.debug("Mídia baixada: %s", path)
+            return True
+        except Exception as e:
+            logger.warning("Erro ao baixar mídia da mensagem %s: %s", message.id, e)
+            return False
+
+    # Produtor/consumidor: a paginação de iter_messages corre em paralelo com
+    # os downloads e a fila limitada mantém a memória em O(max_concurrent)
+    workers = max(1, max_concurrent)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 4)
+
+    async def _producer() -> None:
+        async for message in client.iter_messages(chat_entity, limit=limit):
+            if not message.media:
+                continue
+
+            media_type, ext = _determine_media_type_and_ext(message.media)
+
+            # Pré-filtrar para não enfileirar mídia que não será baixada
+            if media_types is None or media_type in media_types:
+                await queue.put((message, media_type, ext))
+
+        # Um sentinel por worker: terminam depois de esvaziar a fila
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def _worker() -> None:
+        while (item := await queue.get()) is not None:
+            message, media_type, ext = item
+            if await _download_one(message, media_type, ext):
+                counts[media_type] += 1
+                counts["total"] += 1
+
+    tasks = [asyncio.create_task(_worker()) for _ in range(workers)]
+    try:
+        await _producer()
+        await asyncio.gather(*tasks)
+    finally:
+        # Paginação falhou (ou fomos cancelados): não deixa downloads órfãos
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     return counts
 
@@ -808,100 +1165,69 @@ async def export_messages_both_formats(
     chat_entity,
     json_path: str,
     csv_path: str,
+    *,
+    ndjson: bool = True,
+    paced_until: asyncio.Future[Any] | None = None,
 ) -> dict[str, int]:
     """Exporta mensagens para JSON e CSV em uma única iteração (~50% mais rápido).
 
-    Evita duplicar chamadas à API do Telegram iterando mensagens uma única vez.
-    CSV é escrito em streaming, JSON usa buffer para escrever em chunks.
+    Evita duplicar chamadas à API do Telegram iterando mensagens uma única vez:
+    cada mensagem vira uma linha do CSV e um registro do JSON. O lado JSON
+    usa o mesmo gravador dos exportadores de formato único. Se a iteração
+    falhar, os dois arquivos parciais são removidos.
 
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
         json_path: Caminho do arquivo JSON de saída.
         csv_path: Caminho do arquivo CSV de saída.
+        ndjson: Se True, o JSON sai em NDJSON (como
+            ``export_messages_to_json_streaming``); se False, como documento
+            indentado (como ``export_messages_to_json``).
+        paced_until: Exportação que pagina ao mesmo tempo; até ela terminar,
+            o histórico mantém ``HISTORY_OVERLAP_WAIT_TIME`` entre páginas.
 
     Returns:
         Dicionário com contagem de mensagens exportadas.
     """
-    msg_count = 0
-    BUFFER_SIZE = 100  # Escrever JSON a cada 100 mensagens
-
-    with (
-        open(json_path, "wb") as json_f,
-        open(csv_path, "w", newline="", encoding="utf-8") as csv_f,
-    ):
-        # Setup CSV
-        csv_writer = csv.writer(csv_f)
-        csv_writer.writerow(
-            [
-                "ID",
-                "Data",
-                "Remetente ID",
-                "Nome",
-                "Username",
-                "Texto",
-                "Tipo Mídia",
-                "Reply To",
-            ]
-        )
-
-        # Setup JSON header
-        header = {
-            "_format": "ndjson",
-            "export_date": datetime.now().isoformat(),
-            "chat_id": chat_entity.id,
-            "chat_title": _safe_getattr(chat_entity, "title"),
-        }
-        json_f.write(_json_dumps(header))
-
-        # Buffer para mensagens JSON (escrever em chunks)
-        json_buffer = []
-
-        async for message in client.iter_messages(chat_entity):
-            msg_count += 1
-
-            # Serializar uma vez
-            msg_data = _serialize_message(message)
-            json_buffer.append(msg_data)
-
-            # Escrever CSV imediatamente (streaming)
-            sender_name = ""
-            sender_username = ""
-            if message.sender:
-                first_name = _safe_getattr(message.sender, "first_name", "")
-                last_name = _safe_getattr(message.sender, "last_name", "")
-                sender_name = f"{first_name} {last_name}".strip()
-                sender_username = _safe_getattr(message.sender, "username", "")
-
-            media_type = type(message.media).__name__ if message.media else ""
-            reply_to = (
-                _safe_getattr(message.reply_to, "reply_to_msg_id")
-                if message.reply_to
-                else ""
-            )
-
-            csv_writer.writerow(
-                [
-                    message.id,
-                    message.date.isoformat() if message.date else "",
-                    message.sender_id,
-                    sender_name,
-                    sender_username,
-                    message.text or "",
-                    media_type,
-                    reply_to,
-                ]
-            )
-
-            # Flush JSON buffer periodicamente
-            if len(json_buffer) >= BUFFER_SIZE:
-                for msg in json_buffer:
-                    json_f.write(_json_dumps(msg))
-                json_buffer.clear()
+    header = {
+        "export_date": datetime.now(),
+        "chat_id": chat_entity.id,
+        "chat_title": getattr(chat_entity, "title", None),
+    }
 
-        # Escrever mensagens restantes
-        for msg in json_buffer:
-            json_f.write(_json_dumps(msg))
+    try:
+        with open(
+            csv_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as csv_f:
+            csv_writer = csv.writer(csv_f)
+            csv_writer.writerow(MESSAGES_CSV_HEADER)
+            write_row = csv_writer.writerow
+            row: list[Any] = [""] * len(MESSAGES_CSV_HEADER)
+            last_date: list[Any] = [None, ""]
+
+            async def _records() -> AsyncIterator[dict[str, Any]]:
+                history = _iter_history(client, chat_entity, paced_until)
+                async for message in history:
+                    # CSV escrito na hora; o registro segue para o gravador JSON
+                    write_row(_fill_message_csv_row(row, message, last_date))
+                    yield _serialize_message(message)
+
+            if ndjson:
+                msg_count = await _write_record_stream(
+                    json_path, {"_format": "ndjson", **header}, _records()
+                )
+            else:
+                msg_count = await _write_json_document(
+                    json_path, header, "messages", "total_messages", _records()
+                )
+    except BaseException:
+        Path(csv_path).unlink(missing_ok=True)
+        raise
 
     return {"messages_count": msg_count}
 
@@ -911,104 +1237,62 @@ async def export_participants_both_formats(
     chat_entity,
     json_path: str,
     csv_path: str,
+    *,
+    ndjson: bool = True,
 ) -> dict[str, int]:
     """Exporta participantes para JSON e CSV em uma única iteração (~50% mais rápido).
 
     Evita duplicar chamadas à API do Telegram iterando participantes uma única vez.
+    Se a iteração falhar, os dois arquivos parciais são removidos.
 
     Args:
         client: Cliente Telethon conectado.
         chat_entity: Entidade do chat (grupo/canal).
         json_path: Caminho do arquivo JSON de saída.
         csv_path: Caminho do arquivo CSV de saída.
+        ndjson: Se True, o JSON sai em NDJSON; se False, como documento
+            indentado (como ``export_participants_to_json``).
 
     Returns:
         Dicionário com contagem de participantes exportados.
     """
-    part_count = 0
-    BUFFER_SIZE = 100
-
-    with (
-        open(json_path, "wb") as json_f,
-        open(csv_path, "w", newline="", encoding="utf-8") as csv_f,
-    ):
-        # Setup CSV
-        csv_writer = csv.writer(csv_f)
-        csv_writer.writerow(
-            [
-                "ID",
-                "Nome",
-                "Username",
-                "Bot",
-                "Verificado",
-                "Premium",
-                "Telefone",
-                "Data Entrada",
-                "ID Quem Convidou",
-                "Admin Rank",
-            ]
-        )
-
-        # Setup JSON header
-        header = {
-            "_format": "ndjson",
-            "export_date": datetime.now().isoformat(),
-            "chat_id": chat_entity.id,
-            "chat_title": _safe_getattr(chat_entity, "title"),
-        }
-        json_f.write(_json_dumps(header))
-
-        # Buffer para JSON
-        json_buffer = []
-
-        async for participant in client.iter_participants(chat_entity):
-            part_count += 1
-
-            # Serializar uma vez
-            user_data = _serialize_participant(participant, chat_entity)
-            json_buffer.append(user_data)
-
-            # Escrever CSV imediatamente
-            user = participant.user if hasattr(participant, "user") else participant
-
-            first_name = _safe_getattr(user, "first_name", "")
-            last_name = _safe_getattr(user, "last_name", "")
-            full_name = f"{first_name} {last_name}".strip()
-
-            joined_date = None
-            inviter_id = None
-            admin_rank = None
-
-            if hasattr(participant, "participant"):
-                p = participant.participant
-                joined_date = _safe_getattr(p, "date")
-                inviter_id = _safe_getattr(p, "inviter_id")
-                admin_rank = _safe_getattr(p, "admin_rank")
-
-            csv_writer.writerow(
-                [
-                    user.id,
-                    full_name,
-                    _safe_getattr(user, "username", "") or "",
-                    "Sim" if _safe_getattr(user, "bot", False) else "Não",
-                    "Sim" if _safe_getattr(user, "verified", False) else "Não",
-                    "Sim" if _safe_getattr(user, "premium", False) else "Não",
-                    _safe_getattr(user, "phone", "") or "",
-                    joined_date.isoformat() if joined_date else "",
-                    inviter_id or "",
-                    admin_rank or "",
-                ]
-            )
-
-            # Flush JSON buffer periodicamente
-            if len(json_buffer) >= BUFFER_SIZE:
-                for data in json_buffer:
-                    json_f.write(_json_dumps(data))
-                json_buffer.clear()
+    header = {
+        "export_date": datetime.now(),
+        "chat_id": chat_entity.id,
+        "chat_title": getattr(chat_entity, "title", None),
+    }
 
-        # Escrever participantes restantes
-        for data in json_buffer:
-            json_f.write(_json_dumps(data))
+    try:
+        with open(
+            csv_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as csv_f:
+            csv_writer = csv.writer(csv_f)
+            csv_writer.writerow(PARTICIPANTS_CSV_HEADER)
+            write_row = csv_writer.writerow
+            row: list[Any] = [""] * len(PARTICIPANTS_CSV_HEADER)
+
+            async def _records() -> AsyncIterator[dict[str, Any]]:
+                async for participant in client.iter_participants(chat_entity):
+                    # Um só passe pelos atributos alimenta o JSON e o CSV
+                    data = _serialize_participant(participant)
+                    write_row(_fill_participant_csv_row_from_record(row, data))
+                    yield data
+
+            if ndjson:
+                part_count = await _write_record_stream(
+                    json_path, {"_format": "ndjson", **header}, _records()
+                )
+            else:
+                part_count = await _write_json_document(
+                    json_path, header, "participants", "total_participants", _records()
+                )
+    except BaseException:
+        Path(csv_path).unlink(missing_ok=True)
+        raise
 
     return {"participants_count": part_count}
 
@@ -1031,8 +1315,10 @@ async def send_backup_to_cloud(
     Returns:
         Mensagem enviada para o Cloud Chat.
     """
-    logger.info(f"Enviando arquivo para Cloud Chat: {file_path}")
-    return await client.send_file("me", file_path, caption=caption)
+    logger.info("Enviando arquivo para Cloud Chat: %s", file_path)
+    # send_file não repassa part_size_kb; subir antes e enviar o InputFile
+    uploaded = await client.upload_file(file_path, part_size_kb=UPLOAD_PART_SIZE_KB)
+    return await client.send_file("me", uploaded, caption=caption)
 
 
 async def backup_group_with_media(
@@ -1062,90 +1348,99 @@ async def backup_group_with_media(
     """
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    timestamp = _get_timestamp()
-    chat_title = _safe_getattr(chat_entity, "title", str(chat_entity.id))
-    safe_name = "".join(
-        c for c in chat_title if c.isalnum() or c in (" ", "-", "_")
-    ).strip()
-    safe_name = safe_name[:50]  # Limitar tamanho do nome
+    # Um único instante para nomes de arquivo, backup_date e resumo
+    now = datetime.now()
+    timestamp = _get_timestamp(now)
+    chat_title = getattr(chat_entity, "title", str(chat_entity.id))
+    safe_name = _safe_filename(chat_title)
+
+    # Caminhos montados uma vez; cada formato usa os que lhe cabem
+    base = f"{output_dir}/{safe_name}"
+    messages_json = f"{base}_messages_{timestamp}.json"
+    messages_csv = f"{base}_messages_{timestamp}.csv"
+    participants_json = f"{base}_participants_{timestamp}.json"
+    participants_csv = f"{base}_participants_{timestamp}.csv"
 
     results: dict[str, Any] = {
         "chat_id": chat_entity.id,
         "chat_title": chat_title,
-        "backup_date": datetime.now().isoformat(),
+        "backup_date": now.isoformat(),
     }
 
-    # Exportar mensagens
-    if formats == "both":
-        # NOVO: usar função única para iteração única
-        messages_json = f"{output_dir}/{safe_name}_messages_{timestamp}.json"
-        messages_csv = f"{output_dir}/{safe_name}_messages_{timestamp}.csv"
-        msg_result = await export_messages_both_formats(
-            client, chat_entity, messages_json, messages_csv
-        )
-        results["messages_json"] = messages_json
-        results["messages_csv"] = messages_csv
-        results["messages_count"] = msg_result["messages_count"]
-    elif formats == "json":
-        messages_json = f"{output_dir}/{safe_name}_messages_{timestamp}.json"
-        msg_count = await export_messages_to_json_streaming(
-            client, chat_entity, messages_json
-        )
-        results["messages_json"] = messages_json
-        results["messages_count"] = msg_count
-    elif formats == "csv":
-        messages_csv = f"{output_dir}/{safe_name}_messages_{timestamp}.csv"
-        msg_count = await export_messages_to_csv(client, chat_entity, messages_csv)
-        results["messages_csv"] = messages_csv
-        results["messages_count"] = msg_count
-
-    # Exportar participantes (com tratamento de permissão)
-    try:
+    async def _export_messages(participants: asyncio.Future[Any]) -> None:
+        # "both" itera uma única vez; o JSON sai em NDJSON, como em
+        # formats="json" (export_*_to_json_streaming)
         if formats == "both":
-            # NOVO: usar função única para iteração única
-            participants_json = (
-                f"{output_dir}/{safe_name}_participants_{timestamp}.json"
+            msg_result = await export_messages_both_formats(
+                client,
+                chat_entity,
+                messages_json,
+                messages_csv,
+                paced_until=participants,
             )
-            participants_csv = f"{output_dir}/{safe_name}_participants_{timestamp}.csv"
-            part_result = await export_participants_both_formats(
-                client, chat_entity, participants_json, participants_csv
-            )
-            results["participants_json"] = participants_json
-            results["participants_csv"] = participants_csv
-            results["participants_count"] = part_result["participants_count"]
+            results["messages_json"] = messages_json
+            results["messages_csv"] = messages_csv
+            results["messages_count"] = msg_result["messages_count"]
         elif formats == "json":
-            participants_json = (
-                f"{output_dir}/{safe_name}_participants_{timestamp}.json"
-            )
-            part_count = await export_participants_to_json_streaming(
-                client, chat_entity, participants_json
+            msg_count = await export_messages_to_json_streaming(
+                client, chat_entity, messages_json, paced_until=participants
             )
-            results["participants_json"] = participants_json
-            results["participants_count"] = part_count
+            results["messages_json"] = messages_json
+            results["messages_count"] = msg_count
         elif formats == "csv":
-            participants_csv = f"{output_dir}/{safe_name}_participants_{timestamp}.csv"
-            part_count = await export_participants_to_csv(
-                client, chat_entity, participants_csv
-            )
-            results["participants_csv"] = participants_csv
-            results["participants_count"] = part_count
-    except Exception as e:
-        # Tratar erros de permissão (ChatAdminRequiredError)
-        error_name = type(e).__name__
-        if "ChatAdminRequired" in error_name or "admin" in str(e).lower():
-            logger.warning(
-                "Sem permissão para listar participantes (requer admin). "
-                "Continuando backup apenas com mensagens."
+            msg_count = await export_messages_to_csv(
+                client, chat_entity, messages_csv, paced_until=participants
             )
-            results["participants_error"] = "Requer permissão de admin"
-            results["participants_count"] = 0
-        else:
-            raise  # Re-lança outros erros
+            results["messages_csv"] = messages_csv
+            results["messages_count"] = msg_count
+
+    async def _export_participants() -> None:
+        # Tratamento de permissão: sem admin, segue só com mensagens
+        try:
+            if formats == "both":
+                part_result = await export_participants_both_formats(
+                    client, chat_entity, participants_json, participants_csv
+                )
+                results["participants_json"] = participants_json
+                results["participants_csv"] = participants_csv
+                results["participants_count"] = part_result["participants_count"]
+            elif formats == "json":
+                part_count = await export_participants_to_json_streaming(
+                    client, chat_entity, participants_json
+                )
+                results["participants_json"] = participants_json
+                results["participants_count"] = part_count
+            elif formats == "csv":
+                part_count = await export_participants_to_csv(
+                    client, chat_entity, participants_csv
+                )
+                results["participants_csv"] = participants_csv
+                results["participants_count"] = part_count
+        except Exception as e:
+            # Tratar erros de permissão (ChatAdminRequiredError)
+            error_name = type(e).__name__
+            if "ChatAdminRequired" in error_name or "admin" in str(e).lower():
+                logger.warning(
+                    "Sem permissão para listar participantes (requer admin). "
+                    "Continuando backup apenas com mensagens."
+                )
+                results["participants_error"] = "Requer permissão de admin"
+                results["participants_count"] = 0
+            else:
+                raise  # Re-lança outros erros
+
+    await _export_overlapped(
+        _export_messages,
+        _export_participants,
+        (messages_json, messages_csv),
+        (participants_json, participants_csv),
+    )
 
     # Baixar mídia (usar versão paralela para performance)
     if download_media:
         logger.info(
-            f"Baixando arquivos de mídia (máx {max_concurrent_downloads} simultâneos)..."
+            "Baixando arquivos de mídia (máx %s simultâneos)...",
+            max_concurrent_downloads,
         )
         media_counts = await download_media_parallel(
             client,
@@ -1159,45 +1454,47 @@ async def backup_group_with_media(
     # Enviar para Cloud Chat
     if send_to_cloud:
         logger.info("Enviando backup para Cloud Chat (Saved Messages)...")
-        cloud_files = []
-
-        # Enviar mensagens JSON
-        if "messages_json" in results and Path(results["messages_json"]).exists():
-            msg_count = results.get("messages_count", 0)
-            caption = f"📦 Backup: {chat_title} - Mensagens ({msg_count} msgs)"
-            await send_backup_to_cloud(client, results["messages_json"], caption)
-            cloud_files.append("messages_json")
-
-        # Enviar mensagens CSV
-        if "messages_csv" in results and Path(results["messages_csv"]).exists():
-            msg_count = results.get("messages_count", 0)
-            caption = f"📦 Backup: {chat_title} - Mensagens CSV ({msg_count} msgs)"
-            await send_backup_to_cloud(client, results["messages_csv"], caption)
-            cloud_files.append("messages_csv")
-
-        # Enviar participantes JSON
-        if (
-            "participants_json" in results
-            and Path(results["participants_json"]).exists()
-        ):
-            part_count = results.get("participants_count", 0)
-            caption = f"👥 Backup: {chat_title} - Participantes ({part_count} membros)"
-            await send_backup_to_cloud(client, results["participants_json"], caption)
-            cloud_files.append("participants_json")
-
-        # Enviar participantes CSV
-        if "participants_csv" in results and Path(results["participants_csv"]).exists():
-            part_count = results.get("participants_count", 0)
-            caption = (
+        msg_count = results.get("messages_count", 0)
+        part_count = results.get("participants_count", 0)
+        captions = {
+            "messages_json": (
+                f"📦 Backup: {chat_title} - Mensagens ({msg_count} msgs)"
+            ),
+            "messages_csv": (
+                f"📦 Backup: {chat_title} - Mensagens CSV ({msg_count} msgs)"
+            ),
+            "participants_json": (
+                f"👥 Backup: {chat_title} - Participantes ({part_count} membros)"
+            ),
+            "participants_csv": (
                 f"👥 Backup: {chat_title} - Participantes CSV ({part_count} membros)"
-            )
-            await send_backup_to_cloud(client, results["participants_csv"], caption)
-            cloud_files.append("participants_csv")
+            ),
+        }
+        # os.path.exists: um stat() direto, sem montar um Path por arquivo
+        cloud_files = [
+            key
+            for key in captions
+            if key in results and os.path.exists(results[key])
+        ]
+
+        # Uploads independentes: enviados juntos, o tempo total tende ao do
+        # maior arquivo em vez da soma. return_exceptions deixa todos
+        # terminarem antes de propagar a primeira falha.
+        sent = await asyncio.gather(
+            *(
+                send_backup_to_cloud(client, results[key], captions[key])
+                for key in cloud_files
+            ),
+            return_exceptions=True,
+        )
+        for outcome in sent:
+            if isinstance(outcome, BaseException):
+                raise outcome
 
         # Enviar mensagem de resumo
         summary_parts = ["📊 **Resumo do Backup**\n"]
         summary_parts.append(f"📁 Grupo: {chat_title}")
-        summary_parts.append(f"📅 Data: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+        summary_parts.append(f"📅 Data: {now.strftime('%d/%m/%Y %H:%M')}")
         if "messages_count" in results:
             summary_parts.append(f"💬 Mensagens: {results['messages_count']}")
         if "participants_count" in results:
@@ -1211,6 +1508,6 @@ async def backup_group_with_media(
         await client.send_message("me", "\n".join(summary_parts))
         results["cloud_backup"] = True
         results["cloud_files"] = cloud_files
-        logger.info(f"Backup enviado para Cloud Chat: {len(cloud_files)} arquivos")
+        logger.info("Backup enviado para Cloud Chat: %s arquivos", len(cloud_files))
 
     return results
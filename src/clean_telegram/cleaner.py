@@ -5,19 +5,108 @@ Contém as funções para apagar conversas e sair de grupos/canais.
 
 import asyncio
 import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
 
 from telethon import TelegramClient
 from telethon.errors import FloodWaitError, RPCError
 from telethon.tl.functions.channels import LeaveChannelRequest
 from telethon.tl.functions.messages import DeleteChatUserRequest, DeleteHistoryRequest
-from telethon.tl.types import Channel, Chat, InputUserSelf, User
+from telethon.tl.types import Channel, Chat, InputPeerChannel, InputUserSelf, User
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-async def safe_sleep(seconds: float) -> None:
-    """Sleep curto para reduzir risco de rate limit."""
-    await asyncio.sleep(seconds)
+# Diálogos processados simultaneamente por padrão
+DEFAULT_CONCURRENCY = 4
+
+# Ações por segundo (todas as workers somadas) antes de qualquer FloodWait
+DEFAULT_RATE = 5.0
+
+# Backoff em FloodWait: espera mínima da 1ª tentativa e teto (segundos)
+DEFAULT_FLOOD_BASE = 30
+DEFAULT_FLOOD_MAX = 600
+
+# FloodWaits tolerados por ação antes de desistir
+MAX_FLOOD_RETRIES = 5
+
+# Esperas menores que isso são registradas só em DEBUG
+FLOOD_WAIT_LOG_THRESHOLD = 10
+
+
+class AsyncTokenBucket:
+    """Token bucket assíncrono com ajuste adaptativo (AIMD).
+
+    Cada ``acquire()`` reserva o próximo slot livre e só dorme se o bucket
+    estiver vazio. Um FloodWait chama ``penalize()``, que corta a taxa pela
+    metade; cada aquisição seguinte devolve um pouco da taxa até o máximo
+    (aumento aditivo / redução multiplicativa, como no controle de
+    congestionamento do TCP).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        *,
+        min_rate: float = 0.1,
+        increase: float | None = None,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.min_rate = min(min_rate, rate)
+        self.increase = increase if increase is not None else rate / 20
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        """Aguarda até haver um token disponível."""
+        now = asyncio.get_running_loop().time()
+        interval = 1 / self.rate
+        slot = max(self._next_slot, now - (self.capacity - 1) * interval)
+        self._next_slot = slot + interval
+        self.rate = min(self.max_rate, self.rate + self.increase)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def penalize(self, seconds: float = 0.0) -> None:
+        """Reduz a taxa após FloodWait e adia o próximo slot em ``seconds``."""
+        self.rate = max(self.min_rate, self.rate / 2)
+        now = asyncio.get_running_loop().time()
+        self._next_slot = max(self._next_slot, now + seconds)
+
+
+class FloodCooldown:
+    """Pausa compartilhada pelas workers enquanto houver FloodWait pendente.
+
+    ``pause()`` fecha o portão por ``seconds``; ``wait()`` bloqueia até ele
+    reabrir. Com esperas sobrepostas, só a que termina por último reabre:
+    uma espera curta não libera as workers enquanto outra mais longa ainda
+    está em vigor.
+    """
+
+    def __init__(self) -> None:
+        self._open = asyncio.Event()
+        self._open.set()
+        self._resume_at = 0.0
+
+    async def wait(self) -> None:
+        """Aguarda o fim de todas as esperas pendentes."""
+        await self._open.wait()
+
+    async def pause(self, seconds: float) -> None:
+        """Fecha o portão e dorme ``seconds``; reabre se for o prazo final."""
+        deadline = asyncio.get_running_loop().time() + seconds
+        self._resume_at = max(self._resume_at, deadline)
+        self._open.clear()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # Compara prazos, não o relógio: o sleep pode acordar um tique antes
+            if deadline >= self._resume_at:
+                self._open.set()
 
 
 async def delete_dialog(client: TelegramClient, peer, *, dry_run: bool) -> None:
@@ -30,7 +119,7 @@ async def delete_dialog(client: TelegramClient, peer, *, dry_run: bool) -> None:
 
 
 async def leave_channel(
-    client: TelegramClient, entity: Channel, *, dry_run: bool
+    client: TelegramClient, entity: Channel | InputPeerChannel, *, dry_run: bool
 ) -> None:
     """Sai de um canal/megagrupo (Channel)."""
     if dry_run:
@@ -52,6 +141,87 @@ async def leave_legacy_chat(
     await client(DeleteChatUserRequest(chat_id=entity.id, user_id=InputUserSelf()))
 
 
+async def _leave_channel_dialog(
+    client: TelegramClient,
+    entity,
+    peer,
+    title: str,
+    index: int,
+    total: int,
+    *,
+    dry_run: bool,
+) -> None:
+    """Ação para Channel: sai do canal/megagrupo."""
+    logger.info("[%s/%s] SAIR de canal/megagrupo: %s", index, total, title)
+    await leave_channel(client, peer, dry_run=dry_run)
+
+
+async def _leave_legacy_chat_dialog(
+    client: TelegramClient,
+    entity,
+    peer,
+    title: str,
+    index: int,
+    total: int,
+    *,
+    dry_run: bool,
+) -> None:
+    """Ação para Chat: sai do grupo legado, com fallback para delete_dialog."""
+    logger.info("[%s/%s] SAIR de grupo legado (Chat): %s", index, total, title)
+    try:
+        await leave_legacy_chat(client, entity, dry_run=dry_run)
+    except FloodWaitError:
+        # FloodWaitError é um RPCError: sem isto, o fallback mandaria outra
+        # requisição dentro da janela de flood em vez de esperar e repetir
+        raise
+    except RPCError:
+        logger.warning(
+            "Falha ao sair via DeleteChatUserRequest; tentando fallback delete_dialog: %s",
+            title,
+        )
+        if not dry_run:
+            await client.delete_dialog(entity)
+
+
+async def _delete_user_dialog(
+    client: TelegramClient,
+    entity,
+    peer,
+    title: str,
+    index: int,
+    total: int,
+    *,
+    dry_run: bool,
+) -> None:
+    """Ação para User: apaga o histórico da conversa."""
+    logger.info("[%s/%s] APAGAR conversa: %s", index, total, title)
+    await delete_dialog(client, peer, dry_run=dry_run)
+
+
+async def _delete_unknown_dialog(
+    client: TelegramClient,
+    entity,
+    peer,
+    title: str,
+    index: int,
+    total: int,
+    *,
+    dry_run: bool,
+) -> None:
+    """Ação padrão para tipos sem handler: apaga o diálogo."""
+    logger.info("[%s/%s] APAGAR diálogo (tipo desconhecido): %s", index, total, title)
+    if not dry_run:
+        await client.delete_dialog(entity)
+
+
+# Ação por tipo de entidade; tipos ausentes caem em _delete_unknown_dialog
+HANDLERS: dict[type, Callable[..., Awaitable[None]]] = {
+    Channel: _leave_channel_dialog,
+    Chat: _leave_legacy_chat_dialog,
+    User: _delete_user_dialog,
+}
+
+
 async def _process_dialog(
     client: TelegramClient,
     entity,
@@ -59,34 +229,155 @@ async def _process_dialog(
     index: int,
     *,
     dry_run: bool,
+    peer=None,
+    total: int = 0,
 ) -> None:
-    """Processa um único diálogo, escolhendo a ação correta por tipo."""
-    if isinstance(entity, Channel):
-        logger.info("[%s] SAIR de canal/megagrupo: %s", index, title)
-        await leave_channel(client, entity, dry_run=dry_run)
-        return
+    """Processa um único diálogo, escolhendo a ação correta por tipo.
+
+    ``peer`` é o InputPeer já montado com o ``access_hash`` do diálogo; quando
+    informado, é enviado no lugar da entidade completa.
+    """
+    handler = HANDLERS.get(entity.__class__, _delete_unknown_dialog)
+    await handler(
+        client,
+        entity,
+        entity if peer is None else peer,
+        title,
+        index,
+        total,
+        dry_run=dry_run,
+    )
+
+
+def _flood_wait_seconds(
+    error: FloodWaitError, attempt: int, *, base: int, cap: int
+) -> float:
+    """Calcula a espera de um FloodWait com backoff exponencial e jitter.
+
+    O backoff ``base * 2**(attempt-1)`` é limitado a ``cap``, mas nunca fica
+    abaixo do valor informado pelo Telegram. Soma até 10% de jitter para
+    evitar que workers retomem todas ao mesmo tempo.
+    """
+    reported = int(getattr(error, "seconds", 0) or 0)
+    wait = max(reported, min(base * 2 ** (attempt - 1), cap))
+    return wait + random.uniform(0, wait * 0.1)
+
+
+async def with_flood_retry(
+    make_coro: Callable[[], Awaitable[T]],
+    *,
+    title: str,
+    max_retries: int = MAX_FLOOD_RETRIES,
+    base: int = DEFAULT_FLOOD_BASE,
+    cap: int = DEFAULT_FLOOD_MAX,
+    wait: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> T:
+    """Executa ``make_coro()`` repetindo após FloodWait com backoff.
+
+    Ponto único da política de FloodWait: calcula a espera com
+    ``_flood_wait_seconds``, registra e aguarda via ``wait`` antes de tentar
+    de novo. O FloodWaitError é propagado na última tentativa ou quando o
+    Telegram exige uma espera maior que ``cap``.
 
-    if isinstance(entity, Chat):
-        logger.info("[%s] SAIR de grupo legado (Chat): %s", index, title)
+    Args:
+        make_coro: Fábrica da corrotina (uma nova a cada tentativa).
+        title: Nome usado nos logs.
+        max_retries: Número máximo de FloodWaits tolerados.
+        base: Espera mínima (s) da primeira tentativa.
+        cap: Teto (s) para o backoff; esperas exigidas acima dele desistem.
+        wait: Corrotina que aguarda ``wait_s`` segundos.
+    """
+    attempt = 0
+    while True:
         try:
-            await leave_legacy_chat(client, entity, dry_run=dry_run)
-        except RPCError:
-            logger.warning(
-                "Falha ao sair via DeleteChatUserRequest; tentando fallback delete_dialog: %s",
+            return await make_coro()
+        except FloodWaitError as e:
+            attempt += 1
+            if e.seconds > cap:
+                logger.error(
+                    "Telegram exige %ss de espera em '%s', acima do teto de %ss "
+                    "(FLOOD_MAX); pulando.",
+                    e.seconds,
+                    title,
+                    cap,
+                )
+                raise
+            if attempt >= max_retries:
+                logger.error("Max retries atingido; pulando '%s'.", title)
+                raise
+            wait_s = _flood_wait_seconds(e, attempt, base=base, cap=cap)
+            logger.log(
+                logging.WARNING
+                if wait_s >= FLOOD_WAIT_LOG_THRESHOLD
+                else logging.DEBUG,
+                "Rate limit (FloodWait) em '%s'. Aguardando %.0fs (tentativa %s/%s)...",
                 title,
+                wait_s,
+                attempt,
+                max_retries,
             )
-            if not dry_run:
-                await client.delete_dialog(entity)
-        return
+            await wait(wait_s)
 
-    if isinstance(entity, User):
-        logger.info("[%s] APAGAR conversa: %s", index, title)
-        await delete_dialog(client, entity, dry_run=dry_run)
-        return
 
-    logger.info("[%s] APAGAR diálogo (tipo desconhecido): %s", index, title)
-    if not dry_run:
-        await client.delete_dialog(entity)
+async def _process_with_retry(
+    client: TelegramClient,
+    entity,
+    title: str,
+    index: int,
+    *,
+    dry_run: bool,
+    cooldown: FloodCooldown,
+    bucket: AsyncTokenBucket,
+    flood_base: int,
+    flood_max: int,
+    peer=None,
+    total: int = 0,
+) -> bool:
+    """Processa um diálogo com retry em FloodWait (não pula o diálogo).
+
+    Um FloodWait em qualquer worker fecha ``cooldown``, pausando os demais
+    antes da próxima ação sem cancelar as requisições já em andamento.
+
+    Returns:
+        True se o diálogo foi processado com sucesso.
+    """
+
+    async def _attempt() -> None:
+        await cooldown.wait()
+        await bucket.acquire()
+        await _process_dialog(
+            client,
+            entity,
+            title,
+            index,
+            dry_run=dry_run,
+            peer=peer,
+            total=total,
+        )
+
+    async def _pause(wait_s: float) -> None:
+        bucket.penalize(wait_s)
+        await cooldown.pause(wait_s)
+
+    try:
+        await with_flood_retry(
+            _attempt, title=title, base=flood_base, cap=flood_max, wait=_pause
+        )
+        return True
+
+    except FloodWaitError:
+        # O motivo já foi registrado por with_flood_retry; sem dormir, ao
+        # menos reduz a taxa para os demais diálogos
+        bucket.penalize()
+        return False
+
+    except RPCError:
+        logger.exception("RPCError em '%s'", title)
+        return False
+
+    except Exception:
+        logger.exception("Erro inesperado em '%s'", title)
+        return False
 
 
 async def clean_all_dialogs(
@@ -94,69 +385,81 @@ async def clean_all_dialogs(
     *,
     dry_run: bool,
     limit: int = 0,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    flood_base: int = DEFAULT_FLOOD_BASE,
+    flood_max: int = DEFAULT_FLOOD_MAX,
 ) -> int:
     """Limpa todos os diálogos (apaga conversas e sai de grupos/canais).
 
+    A paginação de ``iter_dialogs`` termina antes da primeira ação, para que
+    um FloodWait nas ações não trave a paginação. Depois, até ``concurrency``
+    diálogos são processados simultaneamente, sobrepondo as round-trips ao
+    Telegram em vez de serializá-las.
+
+    As ações usam o ``input_entity`` de cada diálogo (id + ``access_hash``
+    vindos da própria paginação), então nenhuma entidade precisa ser
+    resolvida de novo via RPC.
+
+    Durante as ações, ``client.flood_sleep_threshold`` fica em 0 para que
+    todo FloodWait passe por ``with_flood_retry``; o valor original é
+    restaurado ao final.
+
     Args:
         client: Cliente Telethon conectado.
         dry_run: Se True, não faz alterações (só imprime).
-        limit: Limite de diálogos para processar (0 = todos).
+        limit: Quantos diálogos (os primeiros de ``iter_dialogs``) processar,
+            0 = todos. Diálogos que falham também contam para o limite.
+        concurrency: Número de diálogos processados simultaneamente.
+        flood_base: Espera mínima (s) da primeira tentativa após FloodWait.
+        flood_max: Teto (s) do backoff; diálogos cujo FloodWait exige mais
+            que isso são pulados.
 
     Returns:
         Número de diálogos processados.
     """
-    processed = 0
-
+    dialogs = []
     async for d in client.iter_dialogs():
-        if limit and processed >= limit:
+        if limit and len(dialogs) >= limit:
             break
+        dialogs.append(d)
 
-        title = d.name or "(sem nome)"
-        entity = d.entity
-        index = processed + 1
-
-        # FloodWait retry (não pular o diálogo)
-        max_retries = 5
-        attempt = 0
-        success = False
-        while True:
-            try:
-                await _process_dialog(
-                    client,
-                    entity,
-                    title,
-                    index,
-                    dry_run=dry_run,
-                )
-                await safe_sleep(0.35)
-                success = True
-                break
-
-            except FloodWaitError as e:
-                attempt += 1
-                wait_s = max(5, int(getattr(e, "seconds", 0) or 0))
-                logger.warning(
-                    "Rate limit (FloodWait) em '%s'. Aguardando %ss (tentativa %s/%s)...",
-                    title,
-                    wait_s,
-                    attempt,
-                    max_retries,
-                )
-                await asyncio.sleep(wait_s)
-                if attempt >= max_retries:
-                    logger.error("Max retries atingido; pulando '%s'.", title)
-                    break
-
-            except RPCError:
-                logger.exception("RPCError em '%s'", title)
-                break
-
-            except Exception:
-                logger.exception("Erro inesperado em '%s'", title)
-                break
-
-        # Só incrementa se processou com sucesso
-        if success:
-            processed += 1
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    cooldown = FloodCooldown()
+    bucket = AsyncTokenBucket(DEFAULT_RATE, capacity=concurrency)
+
+    async def _run_one(index: int, d) -> bool:
+        async with semaphore:
+            return await _process_with_retry(
+                client,
+                d.entity,
+                d.name or "(sem nome)",
+                index,
+                dry_run=dry_run,
+                cooldown=cooldown,
+                bucket=bucket,
+                flood_base=flood_base,
+                flood_max=flood_max,
+                peer=d.input_entity,
+                total=len(dialogs),
+            )
+
+    # Nas ações, todo FloodWait deve chegar ao with_flood_retry: sem isso o
+    # Telethon dorme sozinho nos curtos, por fora do token bucket
+    flood_sleep_threshold = client.flood_sleep_threshold
+    client.flood_sleep_threshold = 0
+
+    tasks = [
+        asyncio.create_task(_run_one(index, d))
+        for index, d in enumerate(dialogs, start=1)
+    ]
+
+    processed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            # Só incrementa se processou com sucesso
+            if await next_done:
+                processed += 1
+    finally:
+        client.flood_sleep_threshold = flood_sleep_threshold
 
     return processed
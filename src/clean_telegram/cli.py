@@ -14,7 +14,12 @@ from telethon import TelegramClient
 from telethon.errors import RPCError
 
 from .backup import backup_group_with_media
-from .cleaner import clean_all_dialogs
+from .cleaner import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_FLOOD_BASE,
+    DEFAULT_FLOOD_MAX,
+    clean_all_dialogs,
+)
 from .interactive import interactive_main
 from .reports import (
     generate_all_reports,
@@ -34,10 +39,15 @@ class AuthConfig:
     bot_token: str | None = None
 
 
-def env_int(name: str) -> int:
-    """Lê uma variável de ambiente obrigatória e converte para int."""
+def env_int(name: str, default: int | None = None) -> int:
+    """Lê uma variável de ambiente e converte para int.
+
+    Obrigatória quando ``default`` é None.
+    """
     v = os.getenv(name)
     if not v:
+        if default is not None:
+            return default
         raise SystemExit(f"Faltou {name} no .env")
     try:
         return int(v)
@@ -45,6 +55,45 @@ def env_int(name: str) -> int:
         raise SystemExit(f"Valor inválido para {name}: '{v}' não é um inteiro válido")
 
 
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Configuração lida do ambiente uma única vez, após ``load_dotenv()``.
+
+    Imutável: pode ser compartilhada entre tasks sem cópia. ``main()`` a
+    constrói uma vez e a repassa; as demais funções a recebem pronta.
+    """
+
+    api_id: int
+    api_hash: str
+    auth: AuthConfig
+    flood_base: int = DEFAULT_FLOOD_BASE
+    flood_max: int = DEFAULT_FLOOD_MAX
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        """Lê e valida todas as variáveis de ambiente usadas pelo CLI."""
+        api_id = env_int("API_ID")
+        api_hash = os.getenv("API_HASH")
+        if not api_hash:
+            raise SystemExit("Faltou API_HASH no .env")
+
+        # FLOOD_MAX=0 (ou base negativa) faria todo FloodWait pular o diálogo
+        flood_base = env_int("FLOOD_BASE", DEFAULT_FLOOD_BASE)
+        if flood_base < 0:
+            raise SystemExit(f"Valor inválido para FLOOD_BASE: {flood_base} (mínimo 0)")
+        flood_max = env_int("FLOOD_MAX", DEFAULT_FLOOD_MAX)
+        if flood_max < 1:
+            raise SystemExit(f"Valor inválido para FLOOD_MAX: {flood_max} (mínimo 1)")
+
+        return cls(
+            api_id=api_id,
+            api_hash=api_hash,
+            auth=resolve_auth_config(),
+            flood_base=flood_base,
+            flood_max=flood_max,
+        )
+
+
 def parse_args() -> argparse.Namespace:
     """Parse argumentos da linha de comando."""
     parser = argparse.ArgumentParser(
@@ -64,7 +113,16 @@ def parse_args() -> argparse.Namespace:
         "--limit",
         type=int,
         default=0,
-        help="Limita quantos diálogos processar (0 = todos).",
+        help=(
+            "Processa só os N primeiros diálogos (0 = todos); "
+            "diálogos que falham também contam."
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Diálogos processados simultaneamente na limpeza (padrão: {DEFAULT_CONCURRENCY}).",
     )
     parser.add_argument(
         "-i",
@@ -164,16 +222,10 @@ def resolve_auth_config() -> AuthConfig:
     return AuthConfig(mode="user", session_name=session_name)
 
 
-def create_client() -> tuple[TelegramClient, AuthConfig]:
+def create_client(config: Config) -> tuple[TelegramClient, AuthConfig]:
     """Cria cliente Telegram e metadados de autenticação."""
-    api_id = env_int("API_ID")
-    api_hash = os.getenv("API_HASH")
-    if not api_hash:
-        raise SystemExit("Faltou API_HASH no .env")
-
-    auth_config = resolve_auth_config()
-    client = TelegramClient(auth_config.session_name, api_id, api_hash)
-    return client, auth_config
+    client = TelegramClient(config.auth.session_name, config.api_id, config.api_hash)
+    return client, config.auth
 
 
 async def start_client(client: TelegramClient, auth_config: AuthConfig) -> None:
@@ -274,7 +326,11 @@ async def run_report(args: argparse.Namespace, client: TelegramClient) -> None:
         logger.info("Relatório de contatos gerado: %s", path)
 
 
-async def run_clean(args: argparse.Namespace, client: TelegramClient) -> None:
+async def run_clean(
+    args: argparse.Namespace,
+    client: TelegramClient,
+    config: Config,
+) -> None:
     """Executa limpeza de diálogos."""
     me = await client.get_me()
     logger.info(
@@ -287,6 +343,9 @@ async def run_clean(args: argparse.Namespace, client: TelegramClient) -> None:
         client,
         dry_run=args.dry_run,
         limit=args.limit,
+        concurrency=args.concurrency,
+        flood_base=config.flood_base,
+        flood_max=config.flood_max,
     )
 
     logger.info("Concluído. Diálogos processados: %s", processed)
@@ -329,7 +388,7 @@ async def run_backup(args: argparse.Namespace, client: TelegramClient) -> None:
     if args.backup_group:
         if args.download_media:
             logger.info(
-                f"Fazendo backup completo COM MÍDIA no formato '{output_format}'..."
+                "Fazendo backup completo COM MÍDIA no formato '%s'...", output_format
             )
             results = await backup_group_with_media(
                 client,
@@ -342,7 +401,7 @@ async def run_backup(args: argparse.Namespace, client: TelegramClient) -> None:
                 max_concurrent_downloads=args.max_concurrent_downloads,
             )
         else:
-            logger.info(f"Fazendo backup completo no formato '{output_format}'...")
+            logger.info("Fazendo backup completo no formato '%s'...", output_format)
             # Usar backup_group_with_media mesmo sem mídia para suportar send_to_cloud
             results = await backup_group_with_media(
                 client,
@@ -371,47 +430,51 @@ async def run_backup(args: argparse.Namespace, client: TelegramClient) -> None:
             )
 
         if "messages_json" in results:
-            logger.info(f"  • Mensagens JSON: {results['messages_json']}")
+            logger.info("  • Mensagens JSON: %s", results["messages_json"])
         if "participants_json" in results:
-            logger.info(f"  • Participantes JSON: {results['participants_json']}")
+            logger.info("  • Participantes JSON: %s", results["participants_json"])
 
     # Exportar apenas participantes
     elif args.export_members:
-        from .backup import export_participants_to_csv, export_participants_to_json
+        from .backup import (
+            _safe_filename,
+            export_participants_to_csv,
+            export_participants_to_json,
+        )
 
         timestamp = _get_timestamp()
-        safe_name = "".join(
-            c for c in chat_title if c.isalnum() or c in (" ", "-", "_")
-        ).strip()
+        safe_name = _safe_filename(chat_title)
 
         if output_format in ("json", "both"):
             output_path = f"{output_dir}/{safe_name}_participants_{timestamp}.json"
             count = await export_participants_to_json(client, entity, output_path)
-            logger.info(f"Participantes exportados (JSON): {count} -> {output_path}")
+            logger.info("Participantes exportados (JSON): %s -> %s", count, output_path)
 
         if output_format in ("csv", "both"):
             output_path = f"{output_dir}/{safe_name}_participants_{timestamp}.csv"
             count = await export_participants_to_csv(client, entity, output_path)
-            logger.info(f"Participantes exportados (CSV): {count} -> {output_path}")
+            logger.info("Participantes exportados (CSV): %s -> %s", count, output_path)
 
     # Exportar apenas mensagens
     elif args.export_messages:
-        from .backup import export_messages_to_csv, export_messages_to_json
+        from .backup import (
+            _safe_filename,
+            export_messages_to_csv,
+            export_messages_to_json,
+        )
 
         timestamp = _get_timestamp()
-        safe_name = "".join(
-            c for c in chat_title if c.isalnum() or c in (" ", "-", "_")
-        ).strip()
+        safe_name = _safe_filename(chat_title)
 
         if output_format in ("json", "both"):
             output_path = f"{output_dir}/{safe_name}_messages_{timestamp}.json"
             count = await export_messages_to_json(client, entity, output_path)
-            logger.info(f"Mensagens exportadas (JSON): {count} -> {output_path}")
+            logger.info("Mensagens exportadas (JSON): %s -> %s", count, output_path)
 
         if output_format in ("csv", "both"):
             output_path = f"{output_dir}/{safe_name}_messages_{timestamp}.csv"
             count = await export_messages_to_csv(client, entity, output_path)
-            logger.info(f"Mensagens exportadas (CSV): {count} -> {output_path}")
+            logger.info("Mensagens exportadas (CSV): %s -> %s", count, output_path)
 
 
 async def main() -> None:
@@ -424,7 +487,8 @@ async def main() -> None:
     load_dotenv()
     args = parse_args()
 
-    client, auth_config = create_client()
+    config = Config.from_env()
+    client, auth_config = create_client(config)
     logger.info(
         "Autenticação selecionada: %s (session=%s)",
         auth_config.mode,
@@ -435,7 +499,7 @@ async def main() -> None:
     if args.interactive:
         async with client:
             await start_client(client, auth_config)
-            await interactive_main(client)
+            await interactive_main(client, config, args.concurrency)
         return
 
     # Verificar se é modo backup (não precisa de confirmação)
@@ -450,7 +514,8 @@ async def main() -> None:
     is_clean_mode = not is_backup_mode and not is_report_mode
 
     if not is_backup_mode and not is_report_mode and not args.dry_run and not args.yes:
-        if not confirm_action():
+        # Leitura bloqueante do stdin fora do event loop
+        if not await asyncio.to_thread(confirm_action):
             print("Cancelado.")
             return
 
@@ -468,7 +533,7 @@ async def main() -> None:
             elif is_report_mode:
                 await run_report(args, client)
             else:
-                await run_clean(args, client)
+                await run_clean(args, client, config)
         except RPCError as error:
             logger.error(format_rpc_error(error, auth_config))
 
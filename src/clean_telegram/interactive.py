@@ -5,12 +5,14 @@ semelhante a ferramentas como Claude Code e Mole.
 """
 
 import logging
+from typing import TYPE_CHECKING
 
 import questionary
 from telethon import TelegramClient
+from telethon.tl.types import User
 
 from .backup import backup_group_with_media
-from .cleaner import clean_all_dialogs
+from .cleaner import DEFAULT_CONCURRENCY, clean_all_dialogs
 from .reports import (
     generate_all_reports,
     generate_contacts_report,
@@ -24,6 +26,10 @@ from .ui import (
     suppress_telethon_logs,
 )
 
+if TYPE_CHECKING:
+    # cli importa este módulo; a importação real criaria um ciclo
+    from .cli import Config
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,17 +47,29 @@ CUSTOM_STYLE = questionary.Style(
 )
 
 
-async def interactive_main(client: TelegramClient) -> None:
-    """Menu interativo principal."""
-    while True:
-        me = await client.get_me()
-        username = me.username or me.first_name
+async def interactive_main(
+    client: TelegramClient,
+    config: "Config",
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Menu interativo principal.
+
+    ``config`` e ``concurrency`` vêm do CLI e são repassados à limpeza,
+    para que FLOOD_BASE/FLOOD_MAX e ``--concurrency`` valham também aqui.
+    """
+    # A conta não muda durante a sessão: uma única chamada a get_me
+    me = await client.get_me()
+    username = me.username or me.first_name
+    title = (
+        f"🚀 CleanTelegram - Logado como: {username} (id={me.id})\n"
+        "O que você deseja fazer?"
+    )
 
+    while True:
         # Menu principal (suprimindo logs do Telethon durante interação)
         with suppress_telethon_logs():
             action = await questionary.select(
-                f"🚀 CleanTelegram - Logado como: {username} (id={me.id})\n"
-                "O que você deseja fazer?",
+                title,
                 choices=[
                     questionary.Choice(
                         "🧹 Limpar conta",
@@ -82,13 +100,13 @@ async def interactive_main(client: TelegramClient) -> None:
             print("\n👋 Até logo!")
             break
         elif action == "clean":
-            await interactive_clean(client)
+            await interactive_clean(client, config, concurrency)
         elif action == "reports":
             await interactive_reports(client)
         elif action == "backup":
             await interactive_backup(client)
         elif action == "stats":
-            await interactive_stats(client)
+            await interactive_stats(client, me)
 
         # Pausa antes de voltar ao menu (apenas se não saiu)
         if action != "exit":
@@ -97,7 +115,11 @@ async def interactive_main(client: TelegramClient) -> None:
             ).ask_async()
 
 
-async def interactive_clean(client: TelegramClient) -> None:
+async def interactive_clean(
+    client: TelegramClient,
+    config: "Config",
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
     """Fluxo interativo de limpeza."""
     # Aviso inicial
     confirm = await questionary.confirm(
@@ -156,6 +178,9 @@ async def interactive_clean(client: TelegramClient) -> None:
             client,
             dry_run=dry_run,
             limit=limit_choice,
+            concurrency=concurrency,
+            flood_base=config.flood_base,
+            flood_max=config.flood_max,
         )
 
         if dry_run:
@@ -243,9 +268,13 @@ async def interactive_reports(client: TelegramClient) -> None:
         logger.exception("Erro na geração de relatório")
 
 
-async def interactive_stats(client: TelegramClient) -> None:
-    """Mostra estatísticas da conta."""
-    me = await client.get_me()
+async def interactive_stats(client: TelegramClient, me: User | None = None) -> None:
+    """Mostra estatísticas da conta.
+
+    ``me`` é a conta já obtida pelo menu principal; sem ela, busca via get_me.
+    """
+    if me is None:
+        me = await client.get_me()
 
     # Estatísticas do usuário com tabela Rich
     console.print()
@@ -4,11 +4,11 @@ Gera relatórios de grupos, canais e contatos em diversos formatos.
 """
 
 import csv
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import orjson
 from telethon import TelegramClient
 from telethon.tl.types import Channel, Chat, User
 
@@ -18,14 +18,6 @@ def _get_timestamp() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
-def _safe_getattr(obj: Any, attr: str, default: Any = None) -> Any:
-    """getattr seguro que retorna default se AttributeError ocorrer."""
-    try:
-        return getattr(obj, attr, default)
-    except (AttributeError, TypeError):
-        return default
-
-
 def _is_channel(entity: Any) -> bool:
     """Verifica se a entidade é um Channel (tem atributo megagroup)."""
     return hasattr(entity, "megagroup") or hasattr(entity, "broadcast")
@@ -80,24 +72,21 @@ async def generate_groups_channels_report(
 
         if _is_channel(entity):
             item["type"] = "Channel"
-            item["username"] = _safe_getattr(entity, "username", "")
-            item["participants_count"] = _safe_getattr(entity, "participants_count", 0)
-            item["is_megagroup"] = _safe_getattr(entity, "megagroup", False)
-            item["is_broadcast"] = _safe_getattr(entity, "broadcast", False)
-            item["creator"] = _safe_getattr(entity, "creator", False)
-            item["admin_rights"] = _safe_getattr(entity, "admin_rights") is not None
-            item["date"] = (
-                _safe_getattr(entity, "date").isoformat()
-                if _safe_getattr(entity, "date")
-                else ""
-            )
+            item["username"] = getattr(entity, "username", "")
+            item["participants_count"] = getattr(entity, "participants_count", 0)
+            item["is_megagroup"] = getattr(entity, "megagroup", False)
+            item["is_broadcast"] = getattr(entity, "broadcast", False)
+            item["creator"] = getattr(entity, "creator", False)
+            item["admin_rights"] = getattr(entity, "admin_rights", None) is not None
+            date = getattr(entity, "date", None)
+            item["date"] = date.isoformat() if date else ""
         else:  # Chat (grupo legado)
             item["type"] = "Chat"
             item["username"] = ""
-            item["participants_count"] = _safe_getattr(entity, "participants_count", 0)
+            item["participants_count"] = getattr(entity, "participants_count", 0)
             item["is_megagroup"] = False
             item["is_broadcast"] = False
-            item["creator"] = _safe_getattr(entity, "creator", False)
+            item["creator"] = getattr(entity, "creator", False)
             item["admin_rights"] = False
             item["date"] = ""
 
@@ -153,12 +142,16 @@ async def generate_contacts_report(
             continue
 
         # Formatar nome
-        first_name = _safe_getattr(entity, "first_name", "")
-        last_name = _safe_getattr(entity, "last_name", "")
-        full_name = f"{first_name} {last_name}".strip() or first_name or "(sem nome)"
+        # Nomes ausentes vêm como None do Telethon; sem sobrenome (comum em
+        # bots) o nome é usado direto, sem montar e aparar outra string
+        first_name = getattr(entity, "first_name", None) or ""
+        last_name = getattr(entity, "last_name", None) or ""
+        full_name = (
+            f"{first_name} {last_name}".strip() if last_name else first_name
+        ) or "(sem nome)"
 
         # Status
-        status = _safe_getattr(entity, "status", None)
+        status = getattr(entity, "status", None)
         status_str = ""
         if status:
             if hasattr(status, "was_online"):
@@ -168,15 +161,17 @@ async def generate_contacts_report(
             else:
                 status_str = str(type(status).__name__)
 
+        username = getattr(entity, "username", None)
+
         item: dict[str, Any] = {
             "name": full_name,
             "id": entity.id,
-            "username": f"@{_safe_getattr(entity, 'username', '')}" if _safe_getattr(entity, "username") else "",
-            "is_bot": _safe_getattr(entity, "bot", False),
-            "is_verified": _safe_getattr(entity, "verified", False),
-            "is_premium": _safe_getattr(entity, "premium", False),
+            "username": f"@{username}" if username else "",
+            "is_bot": getattr(entity, "bot", False),
+            "is_verified": getattr(entity, "verified", False),
+            "is_premium": getattr(entity, "premium", False),
             "status": status_str,
-            "phone": _safe_getattr(entity, "phone", ""),
+            "phone": getattr(entity, "phone", ""),
         }
 
         items.append(item)
@@ -320,8 +315,8 @@ def _write_json_report(items: list[dict[str, Any]], output_file: Path, report_ty
         "items": items,
     }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(report, f, ensure_ascii=False, indent=2)
+    # orjson já emite UTF-8 sem escapes ASCII, com a mesma indentação de 2
+    output_file.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
 
 
 def _write_txt_report(items: list[dict[str, Any]], output_file: Path, report_type: str) -> None:
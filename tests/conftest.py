@@ -39,6 +39,29 @@ class AsyncIteratorMock:
             raise StopAsyncIteration
 
 
+# =============================================================================
+# Mensagem do Telethon
+# =============================================================================
+
+class MockMessage:
+    """Mensagem mínima com os atributos lidos pelos exports e downloads.
+
+    ``attrs`` extras viram atributos (ex.: ``should_fail`` em testes de erro).
+    """
+
+    def __init__(
+        self, msg_id, date=None, text=None, sender_id=111, media=None, **attrs
+    ):
+        self.id = msg_id
+        self.date = date
+        self.text = text
+        self.sender_id = sender_id
+        self.media = media
+        self.sender = None
+        self.reply_to = None
+        self.__dict__.update(attrs)
+
+
 # =============================================================================
 # Rich Console Mock
 # =============================================================================
@@ -12,7 +12,7 @@ from clean_telegram.backup import (
     send_backup_to_cloud,
 )
 
-from tests.conftest import AsyncIteratorMock
+from tests.conftest import AsyncIteratorMock, MockMessage
 
 
 # =============================================================================
@@ -103,17 +103,6 @@ def mock_telethon_client():
 def mock_telethon_client_with_messages(mock_telethon_client):
     """Cria um client com mensagens de exemplo."""
 
-    # Mock de mensagens
-    class MockMessage:
-        def __init__(self, msg_id, date, text=None, sender_id=None, media=None):
-            self.id = msg_id
-            self.date = date
-            self.text = text
-            self.sender_id = sender_id
-            self.media = media
-            self.sender = None
-            self.reply_to = None
-
     def mock_iter_messages(*args, **kwargs):
         messages = [
             MockMessage(1, datetime(2024, 1, 1, 10, 0), "Olá!", 111),
@@ -233,9 +222,14 @@ class TestSendBackupToCloud:
         assert len(mock_telethon_client._test_sent_files) == 1
         sent = mock_telethon_client._test_sent_files[0]
         assert sent["entity"] == "me"
-        assert sent["file"] == str(test_file)
         assert sent["caption"] == "📦 Test Backup"
 
+        # Upload feito antes, com partes de 512 KiB, e o InputFile reaproveitado
+        mock_telethon_client.upload_file.assert_awaited_once_with(
+            str(test_file), part_size_kb=512
+        )
+        assert sent["file"] is mock_telethon_client.upload_file.return_value
+
     @pytest.mark.asyncio
     async def test_should_include_caption_with_emoji(
         self, mock_telethon_client, tmp_path
@@ -335,6 +329,72 @@ class TestBackupGroupWithCloud:
         assert results["cloud_backup"] is True
         assert len(results["cloud_files"]) == 4
 
+    @pytest.mark.asyncio
+    async def test_should_upload_files_concurrently(
+        self,
+        mock_client_with_both,
+        mock_chat_entity,
+        temp_backup_dir,
+    ):
+        """Os quatro uploads ficam em voo juntos, não um após o outro."""
+        import asyncio
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_send_file(entity, file, caption=None, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return mock.Mock()
+
+        mock_client_with_both.send_file = slow_send_file
+
+        results = await backup_group_with_media(
+            mock_client_with_both,
+            mock_chat_entity,
+            temp_backup_dir,
+            formats="both",
+            send_to_cloud=True,
+        )
+
+        assert peak == 4
+        assert results["cloud_files"] == [
+            "messages_json", "messages_csv", "participants_json", "participants_csv"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_should_raise_upload_error_after_all_uploads_finish(
+        self,
+        mock_client_with_both,
+        mock_chat_entity,
+        temp_backup_dir,
+    ):
+        """Uma falha de upload propaga, mas só depois dos demais terminarem."""
+        finished = []
+
+        async def flaky_send_file(entity, file, caption=None, **kwargs):
+            if "CSV" in caption:
+                raise ConnectionError("upload falhou")
+            finished.append(file)
+            return mock.Mock()
+
+        mock_client_with_both.send_file = flaky_send_file
+
+        with pytest.raises(ConnectionError):
+            await backup_group_with_media(
+                mock_client_with_both,
+                mock_chat_entity,
+                temp_backup_dir,
+                formats="both",
+                send_to_cloud=True,
+            )
+
+        assert len(finished) == 2
+        assert mock_client_with_both._test_sent_messages == []
+
     @pytest.mark.asyncio
     async def test_should_send_summary_message_to_cloud(
         self,
@@ -446,7 +506,7 @@ class TestBackupGroupWithCloud:
 
         # Simular situação onde arquivo JSON não foi criado (retorna vazio)
         # As funções de exportação não criam arquivos, então não haverá arquivos para enviar
-        async def mock_export_msgs(client, entity, path):
+        async def mock_export_msgs(client, entity, path, **kwargs):
             # Não cria arquivo
             return 0
 
@@ -517,7 +577,7 @@ class TestBackupCloudCLIIntegration:
 
         mock_telethon_client.get_entity = mock_get_entity
 
-        async def mock_export_msgs(client, entity, path):
+        async def mock_export_msgs(client, entity, path, **kwargs):
             # Criar arquivo JSON
             Path(path).parent.mkdir(parents=True, exist_ok=True)
             with open(path, "w") as f:
@@ -562,7 +622,7 @@ class TestBackupCloudErrorHandling:
         """Testa que erro ao enviar arquivo é tratado adequadamente."""
 
         # Mock para criar arquivos locais
-        async def mock_export_msgs(client, entity, path):
+        async def mock_export_msgs(client, entity, path, **kwargs):
             Path(path).parent.mkdir(parents=True, exist_ok=True)
             with open(path, "w") as f:
                 json.dump({"messages": []}, f)
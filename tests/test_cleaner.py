@@ -1,5 +1,6 @@
 """Testes para o módulo cleaner.py."""
 
+import asyncio
 from unittest import mock
 
 import pytest
@@ -159,6 +160,20 @@ async def test_clean_all_dialogs_dry_run_safety(
     mock_client.delete_dialog.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_logs_progress(
+    mock_client, mock_channel, mock_user, caplog
+):
+    """Cada ação é registrada com a posição e o total de diálogos."""
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([mock_channel, mock_user])
+
+    with caplog.at_level("INFO", logger="clean_telegram.cleaner"):
+        await cleaner.clean_all_dialogs(mock_client, dry_run=True)
+
+    assert "[1/2] SAIR de canal/megagrupo: Canal Teste" in caplog.text
+    assert "[2/2] APAGAR conversa: Usuário Teste" in caplog.text
+
+
 @pytest.mark.asyncio
 async def test_clean_all_dialogs_limit(mock_client, mock_channel, mock_chat):
     """Verifica se o limite interrompe o processamento."""
@@ -193,6 +208,34 @@ async def test_clean_all_dialogs_user(mock_client, mock_user):
     assert isinstance(args[0], DeleteHistoryRequest)
 
 
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_unknown_type_uses_delete_dialog(mock_client):
+    """Tipos sem handler em HANDLERS caem no delete_dialog do client."""
+    entity = object()
+    dialog = mock.Mock()
+    dialog.entity = entity
+    dialog.name = "Desconhecido"
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([dialog])
+
+    await cleaner.clean_all_dialogs(mock_client, dry_run=False)
+
+    mock_client.delete_dialog.assert_awaited_once_with(entity)
+    mock_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_uses_dialog_input_entity(mock_client, mock_user):
+    """Verifica que a ação usa o InputPeer do diálogo, sem resolver a entidade."""
+    mock_user.input_entity = mock.sentinel.input_peer
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([mock_user])
+
+    await cleaner.clean_all_dialogs(mock_client, dry_run=False)
+
+    args, _ = mock_client.call_args
+    assert args[0].peer is mock.sentinel.input_peer
+    mock_client.get_input_entity.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_clean_all_dialogs_chat_fallback(mock_client, mock_chat):
     """Testa fallback para delete_dialog quando DeleteChatUserRequest falha."""
@@ -213,6 +256,26 @@ async def test_clean_all_dialogs_chat_fallback(mock_client, mock_chat):
     mock_client.delete_dialog.assert_awaited_once_with(mock_chat.entity)
 
 
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_chat_flood_wait_retries_leave(mock_client, mock_chat):
+    """FloodWait ao sair do Chat é repetido, sem cair no fallback delete_dialog."""
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([mock_chat])
+    mock_client.side_effect = [FloodWaitError(request=None, capture=1), None]
+
+    with mock.patch(
+        "clean_telegram.cleaner.asyncio.sleep", new_callable=mock.AsyncMock
+    ):
+        count = await cleaner.clean_all_dialogs(mock_client, dry_run=False)
+
+    assert count == 1
+    assert mock_client.call_count == 2
+    assert all(
+        isinstance(call.args[0], DeleteChatUserRequest)
+        for call in mock_client.call_args_list
+    )
+    mock_client.delete_dialog.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_clean_all_dialogs_flood_wait_retry(mock_client, mock_user):
     """Testa retry automático em caso de FloodWaitError."""
@@ -225,7 +288,7 @@ async def test_clean_all_dialogs_flood_wait_retry(mock_client, mock_user):
     # Simular FloodWait na primeira tentativa (em delete_dialog), sucesso na segunda
     mock_client.side_effect = [flood_error, None]
 
-    # Patch no asyncio.sleep usado internamente pelo cleaner (tanto em safe_sleep quanto no handler de erro)
+    # Patch no asyncio.sleep usado internamente pelo cleaner (tanto no token bucket quanto no handler de erro)
     with mock.patch(
         "clean_telegram.cleaner.asyncio.sleep", new_callable=mock.AsyncMock
     ) as mock_sleep:
@@ -236,3 +299,160 @@ async def test_clean_all_dialogs_flood_wait_retry(mock_client, mock_user):
 
     # Deve ter chamado duas vezes (1 falha + 1 sucesso)
     assert mock_client.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_disables_flood_sleep_during_actions(
+    mock_client, mock_user
+):
+    """FloodWaits das ações devem chegar ao cleaner; o threshold é restaurado."""
+    mock_client.flood_sleep_threshold = 60
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([mock_user])
+    seen = []
+
+    async def record_threshold(request):
+        seen.append(mock_client.flood_sleep_threshold)
+
+    mock_client.side_effect = record_threshold
+
+    await cleaner.clean_all_dialogs(mock_client, dry_run=False)
+
+    assert seen == [0]
+    assert mock_client.flood_sleep_threshold == 60
+
+
+@pytest.mark.asyncio
+async def test_with_flood_retry_raises_after_max_retries():
+    """Após max_retries FloodWaits seguidos, o erro é propagado."""
+    make_coro = mock.AsyncMock(side_effect=FloodWaitError(request=None, capture=1))
+    wait = mock.AsyncMock()
+
+    with pytest.raises(FloodWaitError):
+        await cleaner.with_flood_retry(
+            make_coro, title="x", max_retries=3, base=1, cap=5, wait=wait
+        )
+
+    assert make_coro.await_count == 3
+    assert wait.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_with_flood_retry_logs_wait_only_when_sleeping(caplog):
+    """A tentativa final não anuncia uma espera que não vai acontecer."""
+    make_coro = mock.AsyncMock(side_effect=FloodWaitError(request=None, capture=1))
+    wait = mock.AsyncMock()
+
+    with caplog.at_level("DEBUG", logger="clean_telegram.cleaner"):
+        with pytest.raises(FloodWaitError):
+            await cleaner.with_flood_retry(
+                make_coro, title="x", max_retries=2, base=1, cap=5, wait=wait
+            )
+
+    assert caplog.text.count("Aguardando") == wait.await_count == 1
+    assert "Max retries atingido; pulando 'x'." in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_clean_all_dialogs_bounded_concurrency(mock_client, mock_user):
+    """Verifica que no máximo `concurrency` diálogos são processados ao mesmo tempo."""
+    mock_client.iter_dialogs.return_value = AsyncIteratorMock([mock_user] * 10)
+
+    in_flight = 0
+    peak = 0
+
+    async def slow_request(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    mock_client.side_effect = slow_request
+
+    with mock.patch("clean_telegram.cleaner.DEFAULT_RATE", 1000.0):
+        count = await cleaner.clean_all_dialogs(
+            mock_client, dry_run=False, concurrency=3
+        )
+
+    assert count == 10
+    assert peak == 3
+
+
+# =============================================================================
+# Testes de AsyncTokenBucket
+# =============================================================================
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_acquisitions():
+    """Verifica que aquisições além da capacidade esperam pelo próximo slot."""
+    bucket = cleaner.AsyncTokenBucket(rate=50.0, capacity=1, increase=0)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(3):
+        await bucket.acquire()
+
+    # Primeira é imediata; as duas seguintes esperam 1/50s cada
+    assert loop.time() - start >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_penalize_halves_rate_and_recovers():
+    """Verifica redução multiplicativa no FloodWait e aumento aditivo depois."""
+    bucket = cleaner.AsyncTokenBucket(rate=10.0, capacity=10, increase=1.0)
+
+    bucket.penalize()
+    assert bucket.rate == 5.0
+
+    await bucket.acquire()
+    assert bucket.rate == 6.0
+
+
+@pytest.mark.asyncio
+async def test_flood_cooldown_reopens_only_after_longest_wait():
+    """Uma espera curta que termina antes não reabre durante a mais longa."""
+    cooldown = cleaner.FloodCooldown()
+
+    long_pause = asyncio.create_task(cooldown.pause(0.05))
+    await cooldown.pause(0.01)
+
+    waiter = asyncio.create_task(cooldown.wait())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await long_pause
+    await asyncio.wait_for(waiter, timeout=1)
+
+
+def test_flood_wait_seconds_backoff_and_cap():
+    """Verifica piso exponencial, respeito ao valor do Telegram e teto."""
+    error = FloodWaitError(request=None, capture=1)
+
+    with mock.patch("clean_telegram.cleaner.random.uniform", return_value=0):
+        assert cleaner._flood_wait_seconds(error, 1, base=30, cap=600) == 30
+        assert cleaner._flood_wait_seconds(error, 3, base=30, cap=600) == 120
+        assert cleaner._flood_wait_seconds(error, 10, base=30, cap=600) == 600
+
+        long_error = FloodWaitError(request=None, capture=300)
+        assert cleaner._flood_wait_seconds(long_error, 1, base=30, cap=600) == 300
+
+        # O teto limita só o backoff, nunca a espera exigida pelo Telegram
+        assert cleaner._flood_wait_seconds(long_error, 5, base=30, cap=200) == 300
+
+
+@pytest.mark.asyncio
+async def test_with_flood_retry_gives_up_when_reported_wait_exceeds_cap(caplog):
+    """Espera exigida acima do teto: desiste sem dormir menos que o pedido."""
+    make_coro = mock.AsyncMock(side_effect=FloodWaitError(request=None, capture=900))
+    wait = mock.AsyncMock()
+
+    with caplog.at_level("ERROR", logger="clean_telegram.cleaner"):
+        with pytest.raises(FloodWaitError):
+            await cleaner.with_flood_retry(
+                make_coro, title="Grupo", base=30, cap=600, wait=wait
+            )
+
+    assert make_coro.await_count == 1
+    wait.assert_not_awaited()
+    assert "exige 900s de espera em 'Grupo'" in caplog.text
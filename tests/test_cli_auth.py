@@ -70,7 +70,7 @@ class TestCreateClient:
         telegram_client_ctor = mock.Mock(return_value=mock.sentinel.client)
         monkeypatch.setattr(cli, "TelegramClient", telegram_client_ctor)
 
-        client, auth_config = cli.create_client()
+        client, auth_config = cli.create_client(cli.Config.from_env())
 
         assert client is mock.sentinel.client
         assert auth_config.mode == "bot"
@@ -88,7 +88,7 @@ class TestCreateClient:
         telegram_client_ctor = mock.Mock(return_value=mock.sentinel.user_client)
         monkeypatch.setattr(cli, "TelegramClient", telegram_client_ctor)
 
-        client, auth_config = cli.create_client()
+        client, auth_config = cli.create_client(cli.Config.from_env())
 
         assert client is mock.sentinel.user_client
         assert auth_config.mode == "user"
@@ -38,6 +38,11 @@ class TestEnvInt:
         result = cli.env_int("TEST_VAR")
         assert result == 0
 
+    def test_should_return_default_when_missing(self, monkeypatch):
+        """Deve retornar o default quando a variável opcional não existe."""
+        monkeypatch.delenv("TEST_VAR", raising=False)
+        assert cli.env_int("TEST_VAR", 30) == 30
+
     def test_should_accept_negative(self, monkeypatch):
         """Deve aceitar negativos."""
         monkeypatch.setenv("TEST_VAR", "-100")
@@ -79,31 +84,54 @@ class TestConfirmAction:
         assert result is False
 
 
+@pytest.fixture
+def cli_config():
+    """Config mínima, como main() montaria a partir do .env."""
+    return cli.Config(
+        api_id=1,
+        api_hash="hash",
+        auth=cli.AuthConfig(mode="user", session_name="session"),
+    )
+
+
 class TestRunClean:
     """Testes para run_clean()."""
 
     @pytest.mark.asyncio
-    async def test_should_call_clean_all_dialogs(self, mock_telethon_client, mocker):
+    async def test_should_call_clean_all_dialogs(
+        self, mock_telethon_client, mocker
+    ):
         """Deve chamar clean_all_dialogs com parâmetros corretos."""
         # Setup
+        config = cli.Config(
+            api_id=1,
+            api_hash="hash",
+            auth=cli.AuthConfig(mode="user", session_name="session"),
+            flood_base=10,
+        )
         mock_telethon_client.get_me = mocker.AsyncMock()
-        args = mock.Mock(dry_run=True, limit=10)
+        args = mock.Mock(dry_run=True, limit=10, concurrency=4)
 
         # Mock clean_all_dialogs
         mock_clean = mocker.patch("clean_telegram.cli.clean_all_dialogs", return_value=5)
 
         # Execute
-        await cli.run_clean(args, mock_telethon_client)
+        await cli.run_clean(args, mock_telethon_client, config)
 
         # Verify
         mock_clean.assert_awaited_once_with(
             mock_telethon_client,
             dry_run=True,
             limit=10,
+            concurrency=4,
+            flood_base=10,
+            flood_max=cli.DEFAULT_FLOOD_MAX,
         )
 
     @pytest.mark.asyncio
-    async def test_should_log_user_info(self, mock_telethon_client, mocker, caplog):
+    async def test_should_log_user_info(
+        self, mock_telethon_client, mocker, caplog, cli_config
+    ):
         """Deve logar informações do usuário."""
         me = mock.Mock()
         me.username = "testuser"
@@ -115,30 +143,30 @@ class TestRunClean:
         mocker.patch("clean_telegram.cli.clean_all_dialogs", return_value=0)
 
         with caplog.at_level("INFO"):
-            await cli.run_clean(args, mock_telethon_client)
+            await cli.run_clean(args, mock_telethon_client, cli_config)
 
         assert "Logado como:" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_should_respect_dry_run(self, mock_telethon_client, mocker):
+    async def test_should_respect_dry_run(self, mock_telethon_client, mocker, cli_config):
         """Deve passar dry_run corretamente."""
         mock_telethon_client.get_me = mocker.AsyncMock()
         mock_clean = mocker.patch("clean_telegram.cli.clean_all_dialogs")
 
         args = mock.Mock(dry_run=True, limit=0)
-        await cli.run_clean(args, mock_telethon_client)
+        await cli.run_clean(args, mock_telethon_client, cli_config)
 
         call_kwargs = mock_clean.call_args[1]
         assert call_kwargs["dry_run"] is True
 
     @pytest.mark.asyncio
-    async def test_should_respect_limit(self, mock_telethon_client, mocker):
+    async def test_should_respect_limit(self, mock_telethon_client, mocker, cli_config):
         """Deve passar limit corretamente."""
         mock_telethon_client.get_me = mocker.AsyncMock()
         mock_clean = mocker.patch("clean_telegram.cli.clean_all_dialogs")
 
         args = mock.Mock(dry_run=True, limit=50)
-        await cli.run_clean(args, mock_telethon_client)
+        await cli.run_clean(args, mock_telethon_client, cli_config)
 
         call_kwargs = mock_clean.call_args[1]
         assert call_kwargs["limit"] == 50
@@ -253,6 +281,50 @@ class TestStartClient:
         mock_client.start.assert_called_once_with()
 
 
+class TestConfig:
+    """Testes para Config.from_env()."""
+
+    def test_should_read_env_once(self, monkeypatch):
+        """Deve montar a configuração completa a partir do ambiente."""
+        monkeypatch.setenv("API_ID", "12345")
+        monkeypatch.setenv("API_HASH", "test_hash")
+        monkeypatch.setenv("FLOOD_BASE", "10")
+        monkeypatch.delenv("FLOOD_MAX", raising=False)
+        monkeypatch.delenv("BOT_TOKEN", raising=False)
+        monkeypatch.delenv("SESSION_NAME", raising=False)
+
+        config = cli.Config.from_env()
+
+        assert config.api_id == 12345
+        assert config.api_hash == "test_hash"
+        assert config.auth.mode == "user"
+        assert config.flood_base == 10
+        assert config.flood_max == cli.DEFAULT_FLOOD_MAX
+
+    @pytest.mark.parametrize(
+        ("name", "value"), [("FLOOD_MAX", "0"), ("FLOOD_BASE", "-1")]
+    )
+    def test_should_reject_invalid_flood_values(self, monkeypatch, name, value):
+        """FLOOD_MAX=0 ou base negativa fariam todo FloodWait pular o diálogo."""
+        monkeypatch.setenv("API_ID", "12345")
+        monkeypatch.setenv("API_HASH", "test_hash")
+        monkeypatch.setenv(name, value)
+
+        with pytest.raises(SystemExit, match=f"Valor inválido para {name}"):
+            cli.Config.from_env()
+
+    def test_should_be_immutable(self, monkeypatch):
+        """Config é frozen (e com slots) para ser compartilhada entre tasks."""
+        monkeypatch.setenv("API_ID", "12345")
+        monkeypatch.setenv("API_HASH", "test_hash")
+
+        config = cli.Config.from_env()
+
+        with pytest.raises(AttributeError):
+            config.flood_base = 1
+        assert not hasattr(config, "__dict__")
+
+
 class TestCreateClient:
     """Testes para create_client()."""
 
@@ -261,7 +333,7 @@ class TestCreateClient:
         monkeypatch.setenv("API_ID", "12345")
         monkeypatch.setenv("API_HASH", "test_hash")
 
-        client, auth_config = cli.create_client()
+        client, auth_config = cli.create_client(cli.Config.from_env())
 
         assert auth_config.mode == "user"
         assert auth_config.session_name == "session"
@@ -273,7 +345,7 @@ class TestCreateClient:
         monkeypatch.setenv("API_HASH", "test_hash")
 
         with pytest.raises(SystemExit, match="Faltou API_ID no .env"):
-            cli.create_client()
+            cli.create_client(cli.Config.from_env())
 
     def test_should_exit_when_api_hash_missing(self, monkeypatch):
         """Deve lançar SystemExit quando API_HASH está faltando."""
@@ -281,7 +353,7 @@ class TestCreateClient:
         monkeypatch.delenv("API_HASH", raising=False)
 
         with pytest.raises(SystemExit, match="Faltou API_HASH no .env"):
-            cli.create_client()
+            cli.create_client(cli.Config.from_env())
 
     def test_should_use_bot_mode_when_token_exists(self, monkeypatch):
         """Deve usar modo bot quando BOT_TOKEN existe."""
@@ -289,7 +361,7 @@ class TestCreateClient:
         monkeypatch.setenv("API_HASH", "test_hash")
         monkeypatch.setenv("BOT_TOKEN", "test_token")
 
-        client, auth_config = cli.create_client()
+        client, auth_config = cli.create_client(cli.Config.from_env())
 
         assert auth_config.mode == "bot"
         assert auth_config.bot_token == "test_token"
@@ -412,6 +484,12 @@ class TestParseArgs:
         args = cli.parse_args()
         assert args.download_media is True
 
+    def test_should_default_concurrency(self, monkeypatch):
+        """Deve usar DEFAULT_CONCURRENCY quando --concurrency é omitido."""
+        monkeypatch.setattr("sys.argv", ["prog"])
+        args = cli.parse_args()
+        assert args.concurrency == cli.DEFAULT_CONCURRENCY
+
     def test_should_default_max_concurrent_downloads_to_5(self, monkeypatch):
         """Deve ter max_concurrent_downloads=5 por padrão."""
         monkeypatch.setattr("sys.argv", ["prog"])
@@ -423,7 +501,9 @@ class TestRunBackup:
     """Testes para run_backup()."""
 
     @pytest.mark.asyncio
-    async def test_should_log_user_info(self, mock_telethon_client, mocker, caplog):
+    async def test_should_log_user_info(
+        self, mock_telethon_client, mocker, caplog, cli_config
+    ):
         """Deve logar informações do usuário."""
         me = mock.Mock()
         me.username = "testuser"
@@ -139,11 +139,37 @@ class TestInteractiveMainMenu:
                 "clean_telegram.interactive.interactive_backup"
             ) as mock_backup:
                 with mock.patch("builtins.print"):
-                    await interactive_main(client)
+                    await interactive_main(client, mock.Mock())
 
             # Verificar que a função de backup foi chamada
             mock_backup.assert_called_once_with(client)
 
+    @pytest.mark.asyncio
+    async def test_main_menu_fetches_account_once(self):
+        """Testa que get_me é chamado uma vez, não a cada volta do menu."""
+        from clean_telegram.interactive import interactive_main
+
+        client = mock.AsyncMock()
+        me = mock.Mock(id=999888, username="testuser", first_name="Test")
+        client.get_me = mock.AsyncMock(return_value=me)
+
+        with mock.patch("clean_telegram.interactive.questionary") as mock_q:
+            mock_q.select.return_value.ask_async = mock.AsyncMock(
+                side_effect=["stats", "stats", "exit"]
+            )
+            mock_q.press_any_key_to_continue.return_value.ask_async = mock.AsyncMock(
+                return_value=None
+            )
+            with mock.patch(
+                "clean_telegram.interactive.interactive_stats"
+            ) as mock_stats:
+                with mock.patch("builtins.print"):
+                    await interactive_main(client, mock.Mock())
+
+        client.get_me.assert_awaited_once()
+        # Estatísticas reaproveitam a conta do menu em vez de outro get_me
+        mock_stats.assert_called_with(client, me)
+
     @pytest.mark.asyncio
     async def test_menu_options(self):
         """Testa que todas as opções esperadas estão no menu."""
@@ -155,3 +181,41 @@ class TestInteractiveMainMenu:
         # Verificar a assinatura da função
         sig = inspect.signature(interactive_backup)
         assert "client" in sig.parameters
+
+
+# =============================================================================
+# Testes: Limpeza interativa
+# =============================================================================
+
+
+class TestInteractiveClean:
+    """Testes do fluxo interativo de limpeza."""
+
+    @pytest.mark.asyncio
+    async def test_clean_forwards_flood_settings_and_concurrency(self):
+        """FLOOD_BASE/FLOOD_MAX e --concurrency também valem no modo interativo."""
+        from clean_telegram.interactive import interactive_clean
+
+        client = mock.AsyncMock()
+        config = mock.Mock(flood_base=5, flood_max=60)
+
+        with mock.patch("clean_telegram.interactive.questionary") as mock_q:
+            # Aviso, dry-run e limite
+            mock_q.confirm.return_value.ask_async = mock.AsyncMock(
+                side_effect=[True, True]
+            )
+            mock_q.select.return_value.ask_async = mock.AsyncMock(return_value=10)
+            with mock.patch(
+                "clean_telegram.interactive.clean_all_dialogs", return_value=3
+            ) as mock_clean:
+                with mock.patch("builtins.print"):
+                    await interactive_clean(client, config, 2)
+
+        mock_clean.assert_awaited_once_with(
+            client,
+            dry_run=True,
+            limit=10,
+            concurrency=2,
+            flood_base=5,
+            flood_max=60,
+        )
@@ -25,6 +25,12 @@ class TestMainModule:
 class TestCliMain:
     """Testes para cli.main() e cli.main_sync()."""
 
+    @pytest.fixture(autouse=True)
+    def _telegram_env(self, monkeypatch):
+        """main() lê API_ID/API_HASH via Config.from_env() antes de criar o cliente."""
+        monkeypatch.setenv("API_ID", "12345")
+        monkeypatch.setenv("API_HASH", "hash123")
+
     def test_should_run_main_async(self, mocker):
         """Deve executar main() de forma assíncrona via main_sync()."""
         from clean_telegram import cli
@@ -124,3 +130,30 @@ class TestCliMain:
         await cli.main()
 
         mock_create.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_main_should_cancel_without_confirmation(self, mocker, capsys):
+        """Deve cancelar sem conectar quando a confirmação é recusada."""
+        from clean_telegram import cli
+
+        mocker.patch("clean_telegram.cli.load_dotenv")
+        mocker.patch("clean_telegram.cli.parse_args", return_value=mock.Mock(
+            interactive=False,
+            dry_run=False,
+            yes=False,
+            report=None,
+            backup_group=None,
+            export_members=None,
+            export_messages=None,
+            limit=0
+        ))
+        mock_client = mocker.AsyncMock()
+        mocker.patch("clean_telegram.cli.create_client", return_value=(mock_client, mock.Mock(mode="user", session_name="session")))
+        mock_confirm = mocker.patch("clean_telegram.cli.confirm_action", return_value=False)
+        mock_clean = mocker.patch("clean_telegram.cli.clean_all_dialogs")
+
+        await cli.main()
+
+        mock_confirm.assert_called_once_with()
+        mock_clean.assert_not_called()
+        assert "Cancelado." in capsys.readouterr().out
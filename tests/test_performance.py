@@ -7,6 +7,7 @@ Estes testes verificam que:
 """
 
 import asyncio
+import json
 import tracemalloc
 from datetime import datetime
 from pathlib import Path
@@ -16,12 +17,26 @@ from unittest import mock
 import pytest
 
 from clean_telegram.backup import (
+    HISTORY_OVERLAP_WAIT_TIME,
+    HISTORY_WAIT_TIME,
+    _determine_media_type_and_ext,
+    _read_ahead,
+    _safe_filename,
+    backup_group_full,
+    backup_group_with_media,
+    download_media_from_chat,
     download_media_parallel,
     export_messages_both_formats,
+    export_messages_to_csv,
+    export_messages_to_json,
     export_messages_to_json_streaming,
+    export_messages_to_msgpack_streaming,
     export_participants_both_formats,
+    export_participants_to_json,
+    export_participants_to_csv,
     export_participants_to_json_streaming,
 )
+from tests.conftest import MockMessage
 
 
 T = TypeVar('T')
@@ -45,6 +60,74 @@ class AsyncIteratorMock(Generic[T]):
         return item
 
 
+class PagedIterator:
+    """Paginação simulada: registra cada item entregue em ``events``.
+
+    Guarda ``wait_time`` como o iterador do Telethon, e ``fail_at`` faz o
+    item de índice dado levantar ``RuntimeError``.
+    """
+
+    def __init__(self, kind, items, events, wait_time=None, fail_at=None):
+        self.kind = kind
+        self.items = iter(items)
+        self.events = events
+        self.wait_time = wait_time
+        self.fail_at = fail_at
+        self.index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0.001)
+        if self.index == self.fail_at:
+            raise RuntimeError("falha simulada")
+        try:
+            item = next(self.items)
+        except StopIteration:
+            raise StopAsyncIteration from None
+        self.events.append(self.kind)
+        self.index += 1
+        return item
+
+
+def _paged_client(
+    events,
+    n_messages=5,
+    n_participants=5,
+    fail_messages_at=None,
+    fail_participants_at=None,
+):
+    """Client cujas paginações intercalam ``events`` ("m" e "p")."""
+    messages = [
+        mock.Mock(
+            id=i, date=None, sender_id=None, sender=None, text="oi",
+            media=None, reply_to=None,
+        )
+        for i in range(n_messages)
+    ]
+    participants = [
+        mock.Mock(spec=["id", "first_name", "last_name"], id=i,
+                  first_name="U", last_name="")
+        for i in range(n_participants)
+    ]
+    client = mock.AsyncMock()
+    client.histories = []
+
+    def iter_messages(*args, wait_time=None, **kwargs):
+        history = PagedIterator(
+            "m", messages, events, wait_time=wait_time, fail_at=fail_messages_at
+        )
+        client.histories.append(history)
+        return history
+
+    client.iter_messages = mock.Mock(side_effect=iter_messages)
+    client.iter_participants = lambda *a, **kw: PagedIterator(
+        "p", participants, events, fail_at=fail_participants_at
+    )
+    return client
+
+
 # =============================================================================
 # Fixtures
 # =============================================================================
@@ -90,20 +173,9 @@ def mock_telethon_client():
 @pytest.fixture
 def mock_client_with_many_messages():
     """Cria client com muitas mensagens para teste de performance."""
-    class MockMessage:
-        def __init__(self, msg_id, text=None, sender_id=None):
-            self.id = msg_id
-            self.date = datetime(2024, 1, 1, 10, 0)
-            self.text = text
-            self.sender_id = sender_id
-            self.media = None
-            self.sender = None
-            self.reply_to = None
-
     # Criar 1000 mensagens
-    messages = [
-        MockMessage(i, f"Mensagem {i}", 111) for i in range(1, 1001)
-    ]
+    date = datetime(2024, 1, 1, 10, 0)
+    messages = [MockMessage(i, date, f"Mensagem {i}") for i in range(1, 1001)]
 
     def mock_iter_messages(*args, **kwargs):
         return AsyncIteratorMock(messages)
@@ -204,6 +276,55 @@ class TestStreamingJsonMemory:
         assert count == 500
         assert peak < 5 * 1024 * 1024, f"Pico de memória muito alto: {peak / 1024 / 1024:.1f} MB"
 
+    @pytest.mark.asyncio
+    async def test_participants_json_export_writes_incrementally(
+        self,
+        mock_client_with_many_participants,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """JSON tradicional de participantes mantém o formato sem lista intermediária."""
+        output_path = tmp_path / "participants.json"
+
+        count = await export_participants_to_json(
+            mock_client_with_many_participants,
+            mock_chat_entity,
+            str(output_path),
+        )
+
+        import json
+        data = json.loads(output_path.read_text(encoding="utf-8"))
+
+        assert count == 500
+        assert data["total_participants"] == 500
+        assert [p["id"] for p in data["participants"]] == list(range(1, 501))
+
+    @pytest.mark.asyncio
+    async def test_json_export_removes_partial_file_on_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Se a iteração falha no meio, nenhum JSON truncado fica no disco."""
+
+        class FailingIterator:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise RuntimeError("ChatAdminRequired")
+
+        client = mock.AsyncMock()
+        client.iter_participants = lambda *a, **kw: FailingIterator()
+        output_path = tmp_path / "participants.json"
+
+        with pytest.raises(RuntimeError):
+            await export_participants_to_json(
+                client, mock_chat_entity, str(output_path)
+            )
+
+        assert not output_path.exists()
+
 
 # =============================================================================
 # Testes: Exportação Ambos Formatos (Iteração Única)
@@ -274,6 +395,258 @@ class TestBothFormatsSingleIteration:
         assert json_path.exists()
         assert csv_path.exists()
 
+    @pytest.mark.asyncio
+    async def test_participants_both_formats_csv_matches_csv_export(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """O CSV montado a partir do dict serializado é igual ao CSV direto."""
+        member = mock.Mock(
+            date=datetime(2024, 3, 1, 12, 0), inviter_id=42, admin_rank="mod"
+        )
+        participants = [
+            mock.Mock(
+                spec=["id", "first_name", "last_name", "username", "bot",
+                      "verified", "premium", "phone", "participant"],
+                id=1, first_name="Ana", last_name="Lima", username="ana",
+                bot=False, verified=True, premium=True, phone="5511",
+                participant=member,
+            ),
+            mock.Mock(
+                spec=["id", "first_name", "last_name", "username", "bot",
+                      "verified", "premium", "phone"],
+                id=2, first_name=None, last_name=None, username=None,
+                bot=True, verified=False, premium=False, phone=None,
+            ),
+        ]
+        client = mock.AsyncMock()
+        client.iter_participants = lambda *a, **kw: AsyncIteratorMock(participants)
+        direct_csv = tmp_path / "direct.csv"
+        both_csv = tmp_path / "both.csv"
+
+        await export_participants_to_csv(client, mock_chat_entity, str(direct_csv))
+        await export_participants_both_formats(
+            client, mock_chat_entity, str(tmp_path / "both.json"), str(both_csv)
+        )
+
+        assert both_csv.read_text(encoding="utf-8") == direct_csv.read_text(
+            encoding="utf-8"
+        )
+
+    @pytest.mark.asyncio
+    async def test_messages_csv_rows_are_independent(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """A lista de linha reutilizada não vaza valores entre mensagens."""
+        import csv
+
+        sender = mock.Mock(first_name="Ana", last_name=None, username=None)
+        with_sender = mock.Mock(
+            id=1, date=None, sender_id=7, sender=sender, text="oi", media=None,
+            reply_to=mock.Mock(reply_to_msg_id=99),
+        )
+        without_sender = mock.Mock(
+            id=2, date=None, sender_id=None, sender=None, text=None, media=None,
+            reply_to=None,
+        )
+        client = mock.AsyncMock()
+        client.iter_messages = mock.Mock(
+            return_value=AsyncIteratorMock([with_sender, without_sender])
+        )
+        output_path = tmp_path / "messages.csv"
+
+        count = await export_messages_to_csv(client, mock_chat_entity, str(output_path))
+
+        with open(output_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+
+        assert count == 2
+        assert rows[1] == ["1", "", "7", "Ana", "", "oi", "", "99"]
+        assert rows[2] == ["2", "", "", "", "", "", "", ""]
+
+    @pytest.mark.asyncio
+    async def test_messages_csv_reuses_repeated_dates_only(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Datas repetidas em sequência reaproveitam a string; as demais mudam."""
+        import csv
+
+        burst = datetime(2024, 1, 1, 10, 0, 5)
+        later = datetime(2024, 1, 1, 10, 0, 6)
+        messages = [
+            mock.Mock(
+                id=i, date=date, sender_id=None, sender=None, text=None,
+                media=None, reply_to=None,
+            )
+            for i, date in enumerate([burst, burst, later, None], start=1)
+        ]
+        client = mock.AsyncMock()
+        client.iter_messages = mock.Mock(return_value=AsyncIteratorMock(messages))
+        output_path = tmp_path / "messages.csv"
+
+        await export_messages_to_csv(client, mock_chat_entity, str(output_path))
+
+        with open(output_path, newline="", encoding="utf-8") as f:
+            dates = [row[1] for row in list(csv.reader(f))[1:]]
+
+        assert dates == [
+            burst.isoformat(), burst.isoformat(), later.isoformat(), ""
+        ]
+
+    @pytest.mark.asyncio
+    async def test_messages_csv_quotes_special_characters(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Textos com vírgula, aspas e quebra de linha voltam intactos do CSV."""
+        import csv
+
+        text = 'linha 1, com vírgula\n"citação" e ; \r\nfim'
+        message = mock.Mock(
+            id=1, date=None, sender_id=7, sender=None, text=text, media=None,
+            reply_to=None,
+        )
+        client = mock.AsyncMock()
+        client.iter_messages = mock.Mock(return_value=AsyncIteratorMock([message]))
+        output_path = tmp_path / "messages.csv"
+
+        await export_messages_to_csv(client, mock_chat_entity, str(output_path))
+
+        with open(output_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+
+        assert len(rows) == 2
+        assert rows[1][5] == text
+
+    @pytest.mark.asyncio
+    async def test_backup_group_full_both_iterates_once(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """backup_group_full('both') chama iter_messages/iter_participants uma vez cada."""
+        client = mock.AsyncMock()
+        client.iter_messages = mock.Mock(return_value=AsyncIteratorMock([]))
+        client.iter_participants = mock.Mock(return_value=AsyncIteratorMock([]))
+
+        results = await backup_group_full(
+            client, mock_chat_entity, str(tmp_path), formats="both"
+        )
+
+        client.iter_messages.assert_called_once()
+        client.iter_participants.assert_called_once()
+        assert Path(results["messages_json"]).exists()
+        assert Path(results["messages_csv"]).exists()
+        assert Path(results["participants_json"]).exists()
+        assert Path(results["participants_csv"]).exists()
+
+    @pytest.mark.asyncio
+    async def test_backup_group_full_both_keeps_json_document(
+        self,
+        mock_client_with_many_messages,
+        mock_client_with_many_participants,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """O .json de 'both' é o mesmo documento indentado de formats='json'."""
+        client = mock_client_with_many_messages
+        client.iter_participants = mock_client_with_many_participants.iter_participants
+
+        results = await backup_group_full(
+            client, mock_chat_entity, str(tmp_path), formats="both"
+        )
+
+        messages = json.loads(Path(results["messages_json"]).read_text("utf-8"))
+        assert messages["total_messages"] == 1000
+        assert [m["id"] for m in messages["messages"]] == list(range(1, 1001))
+        assert messages["chat_id"] == mock_chat_entity.id
+
+        participants = json.loads(
+            Path(results["participants_json"]).read_text("utf-8")
+        )
+        assert participants["total_participants"] == 500
+        assert len(participants["participants"]) == 500
+
+        csv_lines = Path(results["messages_csv"]).read_text("utf-8").splitlines()
+        assert len(csv_lines) == 1001
+
+    @pytest.mark.asyncio
+    async def test_exports_skip_default_history_wait(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Exportar o histórico todo não herda a pausa de 1s entre páginas."""
+        client = mock.AsyncMock()
+        client.iter_messages = mock.Mock(return_value=AsyncIteratorMock([]))
+
+        await export_messages_to_csv(
+            client, mock_chat_entity, str(tmp_path / "m.csv")
+        )
+
+        client.iter_messages.assert_called_once_with(mock_chat_entity, wait_time=0)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ndjson", [True, False])
+    @pytest.mark.parametrize(
+        "exporter, failing_side",
+        [
+            (export_messages_both_formats, "fail_messages_at"),
+            (export_participants_both_formats, "fail_participants_at"),
+        ],
+    )
+    async def test_both_formats_remove_partial_files_on_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+        exporter,
+        failing_side,
+        ndjson,
+    ):
+        """Se a paginação falha no meio, nem o JSON nem o CSV ficam no disco."""
+        client = _paged_client([], **{failing_side: 3})
+
+        with pytest.raises(RuntimeError, match="falha simulada"):
+            await exporter(
+                client,
+                mock_chat_entity,
+                str(tmp_path / "out.json"),
+                str(tmp_path / "out.csv"),
+                ndjson=ndjson,
+            )
+
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "exporter, failing_side",
+        [
+            (export_messages_to_csv, "fail_messages_at"),
+            (export_participants_to_csv, "fail_participants_at"),
+        ],
+    )
+    async def test_csv_export_removes_partial_file_on_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+        exporter,
+        failing_side,
+    ):
+        """Se a paginação falha no meio, nenhum CSV truncado fica no disco."""
+        client = _paged_client([], **{failing_side: 3})
+        output_path = tmp_path / "out.csv"
+
+        with pytest.raises(RuntimeError, match="falha simulada"):
+            await exporter(client, mock_chat_entity, str(output_path))
+
+        assert not output_path.exists()
+
 
 # =============================================================================
 # Testes: Download Paralelo
@@ -293,15 +666,8 @@ class TestParallelDownload:
         """Verifica que download paralelo funciona corretamente."""
         from telethon.tl.types import MessageMediaPhoto
 
-        # Mock de mensagens com mídia
-        class MockMessage:
-            def __init__(self, msg_id):
-                self.id = msg_id
-                self.sender_id = 111
-                self.media = MessageMediaPhoto()
-
         # Criar 10 mensagens com mídia
-        messages = [MockMessage(i) for i in range(1, 11)]
+        messages = [MockMessage(i, media=MessageMediaPhoto()) for i in range(1, 11)]
 
         def mock_iter_messages(*args, **kwargs):
             return AsyncIteratorMock(messages)
@@ -339,17 +705,10 @@ class TestParallelDownload:
         from telethon.tl.types import MessageMediaPhoto
 
         # Mock com algumas mídias que falham
-        class MockMessage:
-            def __init__(self, msg_id, should_fail=False):
-                self.id = msg_id
-                self.sender_id = 111
-                self.media = MessageMediaPhoto()
-                self.should_fail = should_fail
-
         messages = [
-            MockMessage(1, should_fail=False),
-            MockMessage(2, should_fail=True),  # Vai falhar
-            MockMessage(3, should_fail=False),
+            MockMessage(1, media=MessageMediaPhoto(), should_fail=False),
+            MockMessage(2, media=MessageMediaPhoto(), should_fail=True),  # Vai falhar
+            MockMessage(3, media=MessageMediaPhoto(), should_fail=False),
         ]
 
         def mock_iter_messages(*args, **kwargs):
@@ -375,6 +734,282 @@ class TestParallelDownload:
         # Deve baixar apenas os que não falharam
         assert result["total"] == 2  # 1 e 3
 
+    @pytest.mark.asyncio
+    async def test_parallel_download_bounds_read_ahead(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """A paginação não avança mais que a fila limitada à frente dos downloads."""
+        from telethon.tl.types import MessageMediaPhoto
+
+        consumed = 0
+
+        class CountingIterator(AsyncIteratorMock):
+            async def __anext__(self):
+                nonlocal consumed
+                item = await super().__anext__()
+                consumed += 1
+                return item
+
+        messages = [MockMessage(i, media=MessageMediaPhoto()) for i in range(1, 201)]
+        mock_telethon_client.iter_messages = lambda *a, **kw: CountingIterator(messages)
+        release = asyncio.Event()
+        max_consumed_while_blocked = 0
+
+        async def mock_download_media(*args, **kwargs):
+            nonlocal max_consumed_while_blocked
+            if not release.is_set():
+                await asyncio.sleep(0.01)
+                max_consumed_while_blocked = max(max_consumed_while_blocked, consumed)
+                release.set()
+            return "/tmp/file.jpg"
+
+        mock_telethon_client.download_media = mock_download_media
+
+        result = await download_media_parallel(
+            mock_telethon_client,
+            mock_chat_entity,
+            str(tmp_path),
+            max_concurrent=2,
+        )
+
+        assert result["total"] == 200
+        # fila (2 * 4) + itens em download (2) + um put pendente
+        assert max_consumed_while_blocked <= 2 * 4 + 2 + 1
+
+    @pytest.mark.asyncio
+    async def test_parallel_download_classifies_media_types(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Foto via lookup por tipo, documento via nome do arquivo, resto como other."""
+        from telethon.tl.types import (
+            DocumentAttributeFilename,
+            MessageMediaDocument,
+            MessageMediaPhoto,
+        )
+
+        document_media = mock.Mock(spec=MessageMediaDocument)
+        document_media.document = mock.Mock(
+            attributes=[DocumentAttributeFilename(file_name="relatorio.pdf")]
+        )
+        other_media = mock.Mock(spec=[])
+
+        messages = [
+            MockMessage(1, media=MessageMediaPhoto()),
+            MockMessage(2, media=document_media),
+            MockMessage(3, media=other_media),
+        ]
+        mock_telethon_client.iter_messages = lambda *a, **kw: AsyncIteratorMock(messages)
+        files = []
+
+        async def mock_download_media(message, file=None, **kwargs):
+            files.append(Path(file).relative_to(tmp_path / "media").as_posix())
+            return file
+
+        mock_telethon_client.download_media = mock_download_media
+
+        with mock.patch("clean_telegram.backup._get_timestamp", return_value="ts"):
+            result = await download_media_parallel(
+                mock_telethon_client, mock_chat_entity, str(tmp_path)
+            )
+
+        assert (result["photo"], result["document"], result["other"]) == (1, 1, 1)
+        assert sorted(files) == [
+            "document/ts_111_2.pdf",
+            "other/ts_111_3.bin",
+            "photo/ts_111_1.jpg",
+        ]
+
+    def test_document_kind_comes_from_document_attributes(self):
+        """Vídeo, áudio, voz, sticker e GIF são documentos distinguidos por atributo."""
+        from telethon.tl.types import (
+            DocumentAttributeAnimated,
+            DocumentAttributeAudio,
+            DocumentAttributeFilename,
+            DocumentAttributeSticker,
+            DocumentAttributeVideo,
+            InputStickerSetEmpty,
+            MessageMediaDocument,
+            MessageMediaGeoLive,
+        )
+
+        def document(*attributes):
+            media = mock.Mock(spec=MessageMediaDocument)
+            media.document = mock.Mock(attributes=list(attributes))
+            return media
+
+        video_attr = DocumentAttributeVideo(duration=3, w=320, h=240)
+        sticker_attr = DocumentAttributeSticker(alt="", stickerset=InputStickerSetEmpty())
+        cases = {
+            ("gif", ".mp4"): document(
+                video_attr,
+                DocumentAttributeFilename(file_name="gif.mp4"),
+                DocumentAttributeAnimated(),
+            ),
+            ("video", ".mkv"): document(
+                video_attr, DocumentAttributeFilename(file_name="clip.mkv")
+            ),
+            ("video", ".mp4"): document(video_attr),
+            ("voice", ".ogg"): document(DocumentAttributeAudio(duration=5, voice=True)),
+            ("audio", ".flac"): document(
+                DocumentAttributeAudio(duration=5),
+                DocumentAttributeFilename(file_name="musica.flac"),
+            ),
+            ("sticker", ".webp"): document(sticker_attr),
+            ("sticker", ".webm"): document(
+                video_attr,
+                sticker_attr,
+                DocumentAttributeFilename(file_name="sticker.webm"),
+            ),
+            ("document", ".pdf"): document(
+                DocumentAttributeFilename(file_name="relatorio.pdf")
+            ),
+            ("document", ".bin"): document(
+                DocumentAttributeFilename(file_name="LEIAME")
+            ),
+        }
+
+        for expected, media in cases.items():
+            assert _determine_media_type_and_ext(media) == expected
+        # Localização ao vivo não é vídeo
+        live = MessageMediaGeoLive(geo=None, period=60)
+        assert _determine_media_type_and_ext(live) == ("other", ".bin")
+
+    @pytest.mark.asyncio
+    async def test_sequential_download_shares_media_dispatch(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """download_media_from_chat usa a mesma classificação do download paralelo."""
+        from telethon.tl.types import MessageMediaPhoto
+
+        messages = [MockMessage(1, media=MessageMediaPhoto()), MockMessage(2)]
+        mock_telethon_client.iter_messages = lambda *a, **kw: AsyncIteratorMock(messages)
+        mock_telethon_client.download_media = mock.AsyncMock(return_value="/tmp/x.jpg")
+
+        result = await download_media_from_chat(
+            mock_telethon_client, mock_chat_entity, str(tmp_path)
+        )
+
+        assert result["photo"] == 1
+        assert result["total"] == 1
+        mock_telethon_client.download_media.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_sequential_download_pages_ahead(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """A paginação continua enquanto download_media_from_chat baixa."""
+        from telethon.tl.types import MessageMediaPhoto
+
+        events: list[str] = []
+
+        async def paginate():
+            for i in range(3):
+                events.append("p")
+                await asyncio.sleep(0)
+                yield MockMessage(i, media=MessageMediaPhoto())
+
+        async def slow_download(message, file=None, **kwargs):
+            events.append("d")
+            await asyncio.sleep(0.01)
+            return file
+
+        mock_telethon_client.iter_messages = lambda *a, **kw: paginate()
+        mock_telethon_client.download_media = slow_download
+
+        result = await download_media_from_chat(
+            mock_telethon_client, mock_chat_entity, str(tmp_path)
+        )
+
+        assert result["total"] == 3
+        # Sequencial seria "pdpdpd": intercalado prova a leitura adiantada
+        assert "".join(events) != "pdpdpd"
+
+    @pytest.mark.asyncio
+    async def test_parallel_download_uses_one_timestamp_per_run(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Verifica que o timestamp dos nomes é gerado uma vez, não por arquivo."""
+        from telethon.tl.types import MessageMediaPhoto
+
+        messages = [MockMessage(i, media=MessageMediaPhoto()) for i in range(1, 6)]
+        mock_telethon_client.iter_messages = lambda *a, **kw: AsyncIteratorMock(messages)
+        files = []
+
+        async def mock_download_media(message, file=None, **kwargs):
+            files.append(Path(file).name)
+            return file
+
+        mock_telethon_client.download_media = mock_download_media
+
+        with mock.patch(
+            "clean_telegram.backup._get_timestamp", return_value="20240101_000000"
+        ) as mock_ts:
+            await download_media_parallel(
+                mock_telethon_client, mock_chat_entity, str(tmp_path)
+            )
+
+        mock_ts.assert_called_once()
+        assert sorted(files) == [f"20240101_000000_111_{i}.jpg" for i in range(1, 6)]
+
+    @pytest.mark.asyncio
+    async def test_parallel_download_cancels_workers_when_pagination_fails(
+        self,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Verifica que erro na paginação cancela os downloads em andamento."""
+        from telethon.tl.types import MessageMediaPhoto
+
+        started = 0
+        cancelled = 0
+
+        async def paginate():
+            for i in range(1, 4):
+                yield MockMessage(i, media=MessageMediaPhoto())
+            await asyncio.sleep(0)
+            raise ConnectionError("paginação caiu")
+
+        async def stuck_download(*args, **kwargs):
+            nonlocal started, cancelled
+            started += 1
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+
+        mock_telethon_client.iter_messages = lambda *a, **kw: paginate()
+        mock_telethon_client.download_media = stuck_download
+
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(
+                download_media_parallel(
+                    mock_telethon_client,
+                    mock_chat_entity,
+                    str(tmp_path),
+                    max_concurrent=3,
+                ),
+                timeout=1,
+            )
+
+        assert started == cancelled == 3
+
 
 # =============================================================================
 # Testes: Formato NDJSON
@@ -443,3 +1078,481 @@ class TestNdjsonFormat:
         assert "export_date" in header
         assert header["chat_id"] == mock_chat_entity.id
         assert header["chat_title"] == mock_chat_entity.title
+
+    @pytest.mark.asyncio
+    async def test_ndjson_removes_partial_file_on_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Se a paginação falha no meio, nenhum NDJSON truncado fica no disco."""
+
+        class FailingIterator:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise RuntimeError("ChannelPrivate")
+
+        client = mock.AsyncMock()
+        client.iter_messages = lambda *a, **kw: FailingIterator()
+        output_path = tmp_path / "test.ndjson"
+
+        with pytest.raises(RuntimeError):
+            await export_messages_to_json_streaming(
+                client, mock_chat_entity, str(output_path)
+            )
+
+        assert not output_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_ndjson_dates_are_iso_strings(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Datas passadas como datetime saem no mesmo formato de isoformat()."""
+        output_path = tmp_path / "test.ndjson"
+
+        await export_messages_to_json_streaming(
+            mock_client_with_many_messages,
+            mock_chat_entity,
+            str(output_path),
+        )
+
+        import json
+        lines = output_path.read_text().splitlines()
+        header = json.loads(lines[0])
+        first = json.loads(lines[1])
+
+        assert datetime.fromisoformat(header["export_date"])
+        assert first["date"] == datetime(2024, 1, 1, 10, 0).isoformat()
+
+    @pytest.mark.asyncio
+    async def test_json_export_keeps_document_format(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Verifica que o JSON tradicional continua um documento único e legível."""
+        output_path = tmp_path / "test.json"
+
+        count = await export_messages_to_json(
+            mock_client_with_many_messages,
+            mock_chat_entity,
+            str(output_path),
+        )
+
+        import json
+        content = output_path.read_text(encoding="utf-8")
+        data = json.loads(content)
+
+        assert count == 1000
+        assert data["total_messages"] == 1000
+        assert len(data["messages"]) == 1000
+        assert data["chat_title"] == mock_chat_entity.title
+        # Indentado e sem escapes ASCII
+        assert '\n  "chat_id"' in content
+        assert "Grupo de Teste Performance" in content
+
+    @pytest.mark.asyncio
+    async def test_ndjson_streaming_keeps_order_across_batches(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Fila produtor/consumidor preserva a ordem e grava o lote final."""
+        output_path = tmp_path / "test.ndjson"
+
+        count = await export_messages_to_json_streaming(
+            mock_client_with_many_messages,
+            mock_chat_entity,
+            str(output_path),
+        )
+
+        import json
+        lines = output_path.read_text().splitlines()
+
+        assert count == 1000
+        assert [json.loads(line)["id"] for line in lines[1:]] == list(range(1, 1001))
+
+    @pytest.mark.asyncio
+    async def test_ndjson_streaming_propagates_iteration_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Erro na paginação chega ao chamador, não fica preso no produtor."""
+
+        class FailingIterator:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise RuntimeError("ChatAdminRequired")
+
+        client = mock.AsyncMock()
+        client.iter_participants = lambda *a, **kw: FailingIterator()
+
+        with pytest.raises(RuntimeError, match="ChatAdminRequired"):
+            await export_participants_to_json_streaming(
+                client, mock_chat_entity, str(tmp_path / "participants.ndjson")
+            )
+
+
+# =============================================================================
+# Testes: Exportação MessagePack
+# =============================================================================
+
+
+class TestMsgpackExport:
+    """Testes da exportação opt-in em frames MessagePack."""
+
+    @pytest.mark.asyncio
+    async def test_msgpack_export_requires_msgspec(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Sem msgspec, falha com mensagem clara e não cria o arquivo."""
+        output_path = tmp_path / "messages.msgpack"
+
+        with mock.patch("clean_telegram.backup.HAS_MSGSPEC", False):
+            with pytest.raises(RuntimeError, match="msgspec"):
+                await export_messages_to_msgpack_streaming(
+                    mock_client_with_many_messages,
+                    mock_chat_entity,
+                    str(output_path),
+                )
+
+        assert not output_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_msgpack_export_writes_length_prefixed_frames(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Cada frame é uint32 big-endian + payload; o primeiro é o cabeçalho."""
+        msgspec = pytest.importorskip("msgspec")
+        import struct
+
+        output_path = tmp_path / "messages.msgpack"
+
+        count = await export_messages_to_msgpack_streaming(
+            mock_client_with_many_messages,
+            mock_chat_entity,
+            str(output_path),
+        )
+
+        data = output_path.read_bytes()
+        frames = []
+        offset = 0
+        while offset < len(data):
+            (size,) = struct.unpack_from(">I", data, offset)
+            offset += 4
+            frames.append(msgspec.msgpack.decode(data[offset:offset + size]))
+            offset += size
+
+        assert count == 1000
+        assert frames[0]["_format"] == "msgpack"
+        assert frames[0]["chat_id"] == mock_chat_entity.id
+        assert [f["id"] for f in frames[1:]] == list(range(1, 1001))
+
+
+# =============================================================================
+# Testes: NDJSON comprimido (zstd)
+# =============================================================================
+
+
+class TestCompressedNdjson:
+    """Testes da saída NDJSON comprimida com zstd."""
+
+    @pytest.mark.asyncio
+    async def test_compress_requires_zstandard(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Sem zstandard, compress=True falha antes de criar o arquivo."""
+        output_path = tmp_path / "messages.ndjson.zst"
+
+        with mock.patch("clean_telegram.backup.HAS_ZSTD", False):
+            with pytest.raises(RuntimeError, match="zstandard"):
+                await export_messages_to_json_streaming(
+                    mock_client_with_many_messages,
+                    mock_chat_entity,
+                    str(output_path),
+                    compress=True,
+                )
+
+        assert not output_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_compressed_ndjson_round_trip(
+        self,
+        mock_client_with_many_participants,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Descomprimido, o arquivo é o mesmo NDJSON da saída sem compressão."""
+        zstandard = pytest.importorskip("zstandard")
+        import json
+
+        output_path = tmp_path / "participants.ndjson.zst"
+
+        count = await export_participants_to_json_streaming(
+            mock_client_with_many_participants,
+            mock_chat_entity,
+            str(output_path),
+            compress=True,
+        )
+
+        with open(output_path, "rb") as f:
+            raw = zstandard.ZstdDecompressor().stream_reader(f).read()
+        lines = raw.decode("utf-8").splitlines()
+
+        assert count == 500
+        assert json.loads(lines[0])["_format"] == "ndjson"
+        assert [json.loads(line)["id"] for line in lines[1:]] == list(range(1, 501))
+
+
+# =============================================================================
+# Testes: Leitura antecipada da paginação
+# =============================================================================
+
+
+class TestReadAhead:
+    """Testes do produtor/consumidor que antecipa a paginação."""
+
+    @pytest.mark.asyncio
+    async def test_read_ahead_fetches_while_body_is_busy(self):
+        """A iteração avança até maxsize itens enquanto o corpo processa."""
+        fetched = []
+
+        async def pages():
+            for i in range(10):
+                fetched.append(i)
+                yield i
+
+        async with _read_ahead(pages(), maxsize=4) as stream:
+            first = await stream.__anext__()
+            # Corpo "ocupado": o produtor segue até encher a fila
+            for _ in range(10):
+                await asyncio.sleep(0)
+            ahead = len(fetched)
+            rest = [item async for item in stream]
+
+        assert first == 0
+        assert ahead > 1
+        assert [first, *rest] == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_read_ahead_cancels_producer_when_body_fails(self):
+        """Se o corpo falha, a task produtora não fica presa na fila cheia."""
+        started = asyncio.Event()
+
+        async def endless():
+            i = 0
+            while True:
+                started.set()
+                yield i
+                i += 1
+
+        with pytest.raises(RuntimeError):
+            async with _read_ahead(endless(), maxsize=2) as stream:
+                await started.wait()
+                await stream.__anext__()
+                raise RuntimeError("disco cheio")
+
+        await asyncio.sleep(0)
+        pending = [
+            t for t in asyncio.all_tasks() if t is not asyncio.current_task()
+        ]
+        assert pending == []
+
+    @pytest.mark.asyncio
+    async def test_csv_export_propagates_pagination_error(
+        self,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Erro de permissão na paginação ainda chega ao chamador."""
+
+        class FailingIterator:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise RuntimeError("ChatAdminRequired")
+
+        client = mock.AsyncMock()
+        client.iter_participants = lambda *a, **kw: FailingIterator()
+
+        with pytest.raises(RuntimeError, match="ChatAdminRequired"):
+            await export_participants_to_csv(
+                client, mock_chat_entity, str(tmp_path / "participants.csv")
+            )
+
+
+# =============================================================================
+# Testes: Nome de arquivo seguro
+# =============================================================================
+
+
+class TestSafeFilename:
+    """Testes da sanitização do título do chat para nomes de arquivo."""
+
+    @pytest.mark.parametrize(
+        "title",
+        [
+            "Grupo de Teste",
+            "Ação & Reação: 2024/25 🚀",
+            "  -_ espaços _-  ",
+            "群组 名称 ✨ ñ",
+            "a" * 80,
+        ],
+    )
+    def test_matches_per_character_filter(self, title):
+        """Mantém exatamente alfanuméricos, espaço, '-' e '_' (até 50)."""
+        expected = "".join(
+            c for c in title if c.isalnum() or c in (" ", "-", "_")
+        ).strip()[:50]
+
+        assert _safe_filename(title) == expected
+
+
+# =============================================================================
+# Testes: Exportação concorrente em backup_group_full e backup_group_with_media
+# =============================================================================
+
+
+# As duas funções de backup exportam pelo mesmo caminho concorrente
+both_backups = pytest.mark.parametrize(
+    "backup", [backup_group_full, backup_group_with_media]
+)
+
+
+class TestConcurrentBackupExports:
+    """Mensagens e participantes são exportados ao mesmo tempo."""
+
+    @pytest.mark.asyncio
+    @both_backups
+    async def test_messages_and_participants_pagination_overlap(
+        self,
+        backup,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """As duas paginações ficam em voo juntas, não uma após a outra."""
+        events: list[str] = []
+        client = _paged_client(events)
+
+        results = await backup(client, mock_chat_entity, str(tmp_path), formats="csv")
+
+        assert results["messages_count"] == 5
+        assert results["participants_count"] == 5
+        # Sequencial seria "mmmmmppppp": intercalado prova a sobreposição
+        assert "".join(events) != "m" * 5 + "p" * 5
+
+    @pytest.mark.asyncio
+    @both_backups
+    async def test_history_paced_only_while_participants_page(
+        self,
+        backup,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """O histórico mantém a pausa só enquanto os participantes paginam."""
+        events: list[str] = []
+        client = _paged_client(events)
+
+        await backup(client, mock_chat_entity, str(tmp_path), formats="csv")
+
+        client.iter_messages.assert_called_once_with(
+            mock_chat_entity, wait_time=HISTORY_OVERLAP_WAIT_TIME
+        )
+        # Participantes terminados: o iterador volta à paginação sem pausa
+        (history,) = client.histories
+        assert history.wait_time == HISTORY_WAIT_TIME
+
+    @pytest.mark.asyncio
+    @both_backups
+    @pytest.mark.parametrize("formats", ["json", "csv", "both"])
+    async def test_failure_cancels_sibling_and_removes_partial_files(
+        self,
+        backup,
+        mock_chat_entity,
+        tmp_path,
+        formats,
+    ):
+        """Falha nas mensagens cancela os participantes e limpa os parciais."""
+        events: list[str] = []
+        client = _paged_client(events, n_participants=500, fail_messages_at=3)
+
+        with pytest.raises(RuntimeError, match="falha simulada"):
+            await backup(client, mock_chat_entity, str(tmp_path), formats=formats)
+
+        # Participantes cancelados logo após a falha, não paginados até o fim
+        assert events.count("p") < 100
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_admin_error_keeps_messages_export(
+        self,
+        mock_client_with_many_messages,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Falta de admin nos participantes não derruba a exportação paralela."""
+
+        class AdminRequired:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                raise RuntimeError("ChatAdminRequired")
+
+        mock_client_with_many_messages.iter_participants = (
+            lambda *a, **kw: AdminRequired()
+        )
+
+        results = await backup_group_with_media(
+            mock_client_with_many_messages,
+            mock_chat_entity,
+            str(tmp_path),
+            formats="json",
+        )
+
+        assert results["messages_count"] == 1000
+        assert results["participants_count"] == 0
+        assert results["participants_error"] == "Requer permissão de admin"
+
+    @pytest.mark.asyncio
+    @both_backups
+    async def test_backup_date_matches_file_timestamp(
+        self,
+        backup,
+        mock_telethon_client,
+        mock_chat_entity,
+        tmp_path,
+    ):
+        """Nomes de arquivo e backup_date saem do mesmo datetime.now()."""
+        mock_telethon_client.iter_messages = lambda *a, **kw: AsyncIteratorMock([])
+        mock_telethon_client.iter_participants = (
+            lambda *a, **kw: AsyncIteratorMock([])
+        )
+
+        results = await backup(
+            mock_telethon_client, mock_chat_entity, str(tmp_path), formats="json"
+        )
+
+        backup_date = datetime.fromisoformat(results["backup_date"])
+        stamp = backup_date.strftime("%Y%m%d_%H%M%S")
+        assert results["messages_json"].endswith(f"_messages_{stamp}.json")
@@ -462,6 +462,44 @@ async def test_generate_contacts_report_json(mock_client_with_users, tmp_path):
     assert data["total"] == 2  # 2 usuários (Channel é ignorado)
 
 
+@pytest.mark.asyncio
+async def test_generate_contacts_report_handles_missing_names(tmp_path):
+    """Nomes None (como o Telethon entrega) não viram "None" no relatório."""
+
+    class SingleName:
+        id = 1
+        first_name = "Ana"
+        last_name = None
+        username = None
+        bot = False
+
+    class NoName:
+        id = 2
+        first_name = None
+        last_name = None
+        username = "semnome"
+        bot = True
+
+    async def mock_iter_dialogs():
+        for entity in (SingleName(), NoName()):
+            dialog = mock.Mock()
+            dialog.entity = entity
+            yield dialog
+
+    client = mock.AsyncMock()
+    client.iter_dialogs = mock_iter_dialogs
+    output_path = tmp_path / "contacts.json"
+
+    await generate_contacts_report(
+        client, output_path=str(output_path), output_format="json"
+    )
+
+    with open(output_path, encoding="utf-8") as f:
+        names = [item["name"] for item in json.load(f)["items"]]
+
+    assert names == ["Ana", "(sem nome)"]
+
+
 @pytest.mark.asyncio
 async def test_generate_contacts_report_txt(mock_client_with_users, tmp_path):
     """Testa geração de relatório TXT de contatos."""